@@ -0,0 +1,85 @@
+"""测量每渲染一个名字帧时产生的临时内存分配。
+
+对比旧版的 PIL 绘制 → np.array → cvtColor 路径与当前复用 BGR 缓冲区的引擎路径，
+结果以“帧大小的倍数”表示（1.0 表示每帧额外分配了一整帧大小的内存）。
+PIL 内部的分配不经过 tracemalloc，所以旧版路径的数字（不含背景 copy）是下限。
+
+    python benchmarks/bench_allocations.py --width 1920 --height 1080
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import ImageDraw, ImageFont
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from name_flash import BG_IMAGE, BG_SOLID, NameVideoRenderer, RenderConfig  # noqa: E402
+
+
+def legacy_render_name(renderer, name, font):
+    # 旧版 generate_name_video 中每个名字的处理方式
+    cfg = renderer.config
+    img = renderer.background.new_image()
+    draw = ImageDraw.Draw(img)
+    bbox = draw.textbbox((0, 0), name, font=font)
+    text_x = (cfg.frame_size[0] - (bbox[2] - bbox[0])) // 2
+    text_y = (cfg.frame_size[1] - (bbox[3] - bbox[1])) // 2
+    draw.text((text_x, text_y), name, font=font, fill=cfg.text_color)
+    return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+
+
+def measure(render, names, frame_bytes):
+    # 先渲染一遍，让缓存和缓冲区就位，只统计稳定状态下的分配
+    for name in names:
+        render(name)
+    tracemalloc.start()
+    try:
+        total = 0
+        for name in names:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            render(name)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / len(names) / frame_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--names', default=os.path.join(ROOT, '名字示例.txt'))
+    parser.add_argument('--font', default=os.path.join(ROOT, '华文行楷.ttf'))
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--text-size', type=int, default=160)
+    parser.add_argument('--bg-image', default=None, help='使用图片背景（默认纯色）')
+    parser.add_argument('--text-cache-mb', type=float, default=64,
+                        help='文字图层缓存上限；缓存放不下全部名字时，未命中的名字会计入分配')
+    args = parser.parse_args(argv)
+
+    config = RenderConfig(
+        name_file_path=args.names, font_path=args.font, output_path=os.devnull,
+        frame_size=(args.width, args.height), text_size=args.text_size,
+        bg_type=BG_IMAGE if args.bg_image else BG_SOLID,
+        bg_value=args.bg_image or '#000000',
+        text_cache_bytes=int(args.text_cache_mb * 1024 * 1024))
+    renderer = NameVideoRenderer(config)
+    font = ImageFont.truetype(config.font_path, config.text_size)
+    names = renderer.load_names()
+    frame_bytes = args.width * args.height * 3
+
+    legacy = measure(lambda name: legacy_render_name(renderer, name, font), names, frame_bytes)
+    engine = measure(lambda name: renderer.render_name(name, font), names, frame_bytes)
+    print(f"分辨率 {args.width}x{args.height}，{len(names)} 个名字")
+    print(f"旧版 PIL 路径：每帧临时分配 {legacy:.2f} 帧")
+    print(f"复用缓冲区：  每帧临时分配 {engine:.2f} 帧"
+          f"（文字缓存命中率 {renderer.text_cache.stats()['hit_rate'] * 100:.1f}%）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""渲染吞吐量基准测试，结果保存为 JSON，并可与保存的基线比较。
+
+名单使用仓库自带的名字示例.txt，以及用其中的汉字随机组合出的 1k / 100k 个名字；
+背景覆盖纯色、图片和视频（图片和视频在临时目录中生成），分辨率和输出后端可以选择。
+每个用例在独立的子进程中运行，峰值内存（RSS）互不影响。另外用 python -X importtime 测量
+界面（main.py）、命令行和渲染引擎的导入耗时，超过 IMPORT_BUDGET_MS 中的预算同样视为退化。
+
+    python benchmarks/bench_suite.py --json results.json --save-baseline baseline.json
+    python benchmarks/bench_suite.py --baseline baseline.json --threshold 0.15
+
+与基线相比，任一用例的帧率下降或峰值内存增长超过阈值时以退出码 1 结束。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from name_flash.writers import WRITER_FFMPEG, WRITER_OPENCV, find_ffmpeg  # noqa: E402
+
+ROSTERS = {'bundled': None, '1k': 1000, '100k': 100000}
+BACKGROUNDS = ('solid', 'image', 'video')
+DEFAULT_SIZES = ('192x108', '1280x720')
+DEFAULT_ROSTERS = ('bundled', '1k')
+DEFAULT_THRESHOLD = 0.15
+# 各入口模块的导入耗时预算（毫秒）：界面要在加载编码库之前显示，命令行的 --help 不应加载 numpy/OpenCV
+IMPORT_BUDGET_MS = {'main': 250, 'name_flash.cli': 250, 'name_flash.engine': 800}
+IMPORT_REPEAT = 5
+# 导入耗时的测量抖动较大，与基线比较时在比例阈值之外再放宽这么多毫秒
+IMPORT_NOISE_MS = 50
+
+
+def make_roster(path, count, seed=0):
+    """用自带名单中出现过的汉字随机组合出 count 个 2~4 字的名字（字体一定能显示）。"""
+    with open(os.path.join(ROOT, '名字示例.txt'), 'r', encoding='utf-8') as f:
+        chars = sorted({c for line in f for c in line.strip()})
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(count):
+            f.write(''.join(rng.choice(chars) for _ in range(rng.randint(2, 4))) + '\n')
+
+
+def make_backgrounds(tmp):
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    image_path = os.path.join(tmp, 'bg.png')
+    cv2.imwrite(image_path, rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8))
+    video_path = os.path.join(tmp, 'bg.mp4')
+    out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), 30, (640, 360))
+    gradient = np.linspace(0, 255, 640, dtype=np.uint8)[None, :, None].repeat(360, 0).repeat(3, 2)
+    for i in range(90):
+        out.write(np.roll(gradient, i * 7, axis=1))
+    out.release()
+    return {'solid': ('solid', '#203040'), 'image': ('image', image_path), 'video': ('video', video_path)}
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows 没有 resource 模块
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(case):
+    """在子进程中运行一个用例并返回测量结果。"""
+    from name_flash import NameVideoRenderer, RenderConfig
+    from name_flash.constants import BG_ALIASES
+
+    config = RenderConfig(
+        name_file_path=case['names'], font_path=os.path.join(ROOT, '华文行楷.ttf'),
+        output_path=case['output'], frame_size=tuple(case['frame_size']),
+        text_size=max(10, case['frame_size'][1] * 2 // 3),
+        bg_type=BG_ALIASES[case['bg_type']], bg_value=case['bg_value'],
+        writer=case['writer'], preset='veryfast', seed=0)
+    renderer = NameVideoRenderer(config)
+    start = time.perf_counter()
+    frames = renderer.render()
+    seconds = time.perf_counter() - start
+    names = frames // max(1, config.frames_per_name)
+    # 静态背景下每个名字只渲染一次，视频背景下每一帧都要重新合成
+    unique = frames if case['bg_type'] == 'video' else names
+    output_bytes = os.path.getsize(case['output'])
+    os.remove(case['output'])
+    return {
+        'frames': frames,
+        'seconds': seconds,
+        'frames_per_sec': frames / seconds if seconds else 0.0,
+        'ms_per_unique_frame': seconds * 1000 / unique if unique else 0.0,
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'output_bytes': output_bytes,
+    }
+
+
+def measure_import_ms(module, repeat=IMPORT_REPEAT):
+    """在全新的解释器中导入 module，返回多次测量中最短的累计导入耗时（毫秒）；导入失败时返回 None。"""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            return None
+        # 最后一行是 module 本身：import time: 自身 | 累计 | 模块名
+        cumulative_us = int(result.stderr.strip().splitlines()[-1].split('|')[1])
+        best = cumulative_us if best is None else min(best, cumulative_us)
+    return best / 1000
+
+
+def compare(results, baseline, threshold):
+    """返回超过阈值的退化列表：[(用例, 指标, 基线值, 当前值), ...]。"""
+    regressions = []
+    for case_id, current in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            continue
+        if 'import_ms' in current:
+            if current['import_ms'] > base['import_ms'] * (1 + threshold) + IMPORT_NOISE_MS:
+                regressions.append((case_id, 'import_ms', base['import_ms'], current['import_ms']))
+            continue
+        if base['frames_per_sec'] and current['frames_per_sec'] < base['frames_per_sec'] * (1 - threshold):
+            regressions.append((case_id, 'frames_per_sec', base['frames_per_sec'], current['frames_per_sec']))
+        if base.get('peak_rss_bytes') and current.get('peak_rss_bytes') \
+                and current['peak_rss_bytes'] > base['peak_rss_bytes'] * (1 + threshold):
+            regressions.append((case_id, 'peak_rss_bytes', base['peak_rss_bytes'], current['peak_rss_bytes']))
+    return regressions
+
+
+def _split(value):
+    return [v for v in value.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rosters', default=','.join(DEFAULT_ROSTERS),
+                        help=f"名单，逗号分隔：{'/'.join(ROSTERS)}")
+    parser.add_argument('--backgrounds', default=','.join(BACKGROUNDS), help='背景类型，逗号分隔')
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help='分辨率，逗号分隔，例如 1920x1080')
+    parser.add_argument('--writers', default='',
+                        help='输出后端，逗号分隔；默认测试 opencv，有 ffmpeg 时再加上 ffmpeg')
+    parser.add_argument('--json', default=None, help='把结果写入 JSON 文件')
+    parser.add_argument('--baseline', default=None, help='与这个基线文件比较')
+    parser.add_argument('--save-baseline', default=None, help='把本次结果另存为基线')
+    parser.add_argument('--skip-imports', action='store_true', help='不测量导入耗时')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='允许的退化比例（默认 0.15，即帧率下降或峰值内存增长超过 15%% 视为退化）')
+    args = parser.parse_args(argv)
+
+    writers = _split(args.writers) or [WRITER_OPENCV] + ([WRITER_FFMPEG] if find_ffmpeg('ffmpeg') else [])
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        backgrounds = make_backgrounds(tmp)
+        rosters = {}
+        for roster in _split(args.rosters):
+            if ROSTERS[roster] is None:
+                rosters[roster] = os.path.join(ROOT, '名字示例.txt')
+            else:
+                rosters[roster] = os.path.join(tmp, f'names_{roster}.txt')
+                make_roster(rosters[roster], ROSTERS[roster])
+
+        print(f"{'用例':<36}{'帧/秒':>10}{'毫秒/独立帧':>14}{'峰值内存(MB)':>14}{'输出(KB)':>12}")
+        for roster, names_path in rosters.items():
+            for bg in _split(args.backgrounds):
+                for size in _split(args.sizes):
+                    width, height = (int(v) for v in size.lower().split('x'))
+                    for writer in writers:
+                        case_id = f'{roster}/{bg}/{width}x{height}/{writer}'
+                        bg_type, bg_value = backgrounds[bg]
+                        case = {'names': names_path, 'output': os.path.join(tmp, 'out.mp4'),
+                                'frame_size': [width, height], 'bg_type': bg_type,
+                                'bg_value': bg_value, 'writer': writer}
+                        # 每个用例使用全新的子进程，峰值内存只包含这个用例
+                        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                            r = results[case_id] = pool.submit(run_case, case).result()
+                        rss = r['peak_rss_bytes'] / 1024 / 1024 if r['peak_rss_bytes'] else float('nan')
+                        print(f"{case_id:<36}{r['frames_per_sec']:>10.0f}{r['ms_per_unique_frame']:>14.2f}"
+                              f"{rss:>14.1f}{r['output_bytes'] / 1024:>12.1f}", flush=True)
+
+    regressions = []
+    if not args.skip_imports:
+        print(f"{'导入':<36}{'耗时(毫秒)':>12}{'预算(毫秒)':>12}")
+        for module, budget in IMPORT_BUDGET_MS.items():
+            import_ms = measure_import_ms(module)
+            if import_ms is None:
+                print(f"{module:<36}{'导入失败':>12}")
+                continue
+            results[f'import/{module}'] = {'import_ms': import_ms, 'budget_ms': budget}
+            print(f"{module:<36}{import_ms:>12.1f}{budget:>12}")
+            if import_ms > budget:
+                regressions.append((f'import/{module}', 'import_ms', budget, import_ms))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions += compare(results, baseline, args.threshold)
+    for case_id, metric, base, current in regressions:
+        print(f"退化：{case_id} {metric} 基线/预算 {base:.1f}，本次 {current:.1f}")
+    if regressions:
+        return 1
+    if args.baseline:
+        print(f"与基线相比没有超过 {args.threshold * 100:.0f}% 的退化")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
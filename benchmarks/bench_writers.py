@@ -0,0 +1,65 @@
+"""比较不同输出后端的编码耗时与文件大小。
+
+使用仓库自带的字体和名单渲染同一段视频，依次交给 OpenCV（mp4v）和 ffmpeg
+（libx264 / libx265 / VP9，普通模式与保持帧模式），没有 ffmpeg 时只测 OpenCV。
+
+    python benchmarks/bench_writers.py --width 1280 --height 720
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from name_flash import NameVideoRenderer, RenderConfig  # noqa: E402
+from name_flash.writers import (CODEC_H264, CODEC_H265, CODEC_VP9, WRITER_FFMPEG,  # noqa: E402
+                                WRITER_OPENCV, find_ffmpeg)
+
+CASES = [
+    ('opencv mp4v', dict(writer=WRITER_OPENCV), '.mp4'),
+    ('ffmpeg libx264', dict(writer=WRITER_FFMPEG, codec=CODEC_H264), '.mp4'),
+    ('ffmpeg libx264 保持帧', dict(writer=WRITER_FFMPEG, codec=CODEC_H264, hold_frames=True), '.mp4'),
+    ('ffmpeg libx265', dict(writer=WRITER_FFMPEG, codec=CODEC_H265), '.mp4'),
+    ('ffmpeg libx265 保持帧', dict(writer=WRITER_FFMPEG, codec=CODEC_H265, hold_frames=True), '.mp4'),
+    ('ffmpeg vp9', dict(writer=WRITER_FFMPEG, codec=CODEC_VP9), '.webm'),
+    ('ffmpeg vp9 保持帧', dict(writer=WRITER_FFMPEG, codec=CODEC_VP9, hold_frames=True), '.webm'),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--names', default=os.path.join(ROOT, '名字示例.txt'))
+    parser.add_argument('--font', default=os.path.join(ROOT, '华文行楷.ttf'))
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--text-size', type=int, default=120)
+    parser.add_argument('--preset', default='medium')
+    parser.add_argument('--ffmpeg', default='ffmpeg')
+    args = parser.parse_args(argv)
+
+    has_ffmpeg = find_ffmpeg(args.ffmpeg) is not None
+    if not has_ffmpeg:
+        print("未找到 ffmpeg，只测试 OpenCV 后端")
+
+    print(f"{'后端':<24}{'耗时(秒)':>10}{'文件大小(KB)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options, ext in CASES:
+            if options['writer'] == WRITER_FFMPEG and not has_ffmpeg:
+                continue
+            output = os.path.join(tmp, f'out{ext}')
+            config = RenderConfig(
+                name_file_path=args.names, font_path=args.font, output_path=output,
+                frame_size=(args.width, args.height), text_size=args.text_size,
+                preset=args.preset, ffmpeg_path=args.ffmpeg, **options)
+            start = time.perf_counter()
+            NameVideoRenderer(config).render()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24}{elapsed:>10.2f}{os.path.getsize(output) / 1024:>14.1f}")
+            os.remove(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,42 @@
-import cv2
-from PIL import Image, ImageDraw, ImageFont
 import os
-import numpy as np
 import tkinter as tk
 from tkinter import filedialog, messagebox, colorchooser
 from tkinter import ttk
 import threading
-import random
+import queue
 import webbrowser
 import ctypes
 from ctypes import wintypes
 import sys
 
-# 确保中文显示正常
-import matplotlib
-matplotlib.use('Agg')  # 非交互式后端，避免tkinter冲突
+# 这里只导入常量和进度通道（不会加载 numpy、PIL、OpenCV），窗口先显示出来，
+# 渲染引擎在后台线程中预先导入，点击“生成视频”时才真正用到
+from name_flash import (BG_IMAGE, BG_SOLID, BG_VIDEO, FIT_CONTAIN, FIT_COVER, FIT_STRETCH,
+                        ProgressChannel, RenderCancelled)
+from name_flash.progress import format_seconds
+
+# 窗口显示后开始预先导入渲染引擎的延迟（毫秒）
+ENGINE_PRELOAD_DELAY_MS = 200
+
+# 界面轮询渲染进度的间隔（毫秒）
+PROGRESS_POLL_MS = 100
+
+# 当前正在进行的渲染任务的进度通道（用于取消）
+current_progress = None
+
+# 实时预览：输入停止变化多久后开始渲染、界面轮询预览结果的间隔（毫秒）
+PREVIEW_DEBOUNCE_MS = 60
+PREVIEW_POLL_MS = 15
+
+# 预览线程的请求队列只保留最新的一次设置，结果队列由界面线程取走
+preview_requests = queue.Queue(maxsize=1)
+preview_results = queue.Queue()
+preview_thread = None
+preview_after_id = None
+preview_polling = False
+# 最近一次提交的请求编号和设置（设置没有变化时不重复渲染）
+preview_seq = 0
+preview_settings = None
 
 # 检测系统是否为Windows 10/11
 is_windows = sys.platform.startswith('win32')
@@ -99,80 +121,53 @@ else:
 
 
 def generate_name_video(name_file_path, font_path, output_path, fps, frame_size, interval,
-                        text_size, text_color, bg_type, bg_value, progress_var, root):
+                        text_size, text_color, bg_type, bg_value, progress, result, bg_fit=FIT_STRETCH,
+                        cache_dir=None, auto_fit=False):
+    # 在后台线程中运行：界面只负责收集参数，渲染交给 name_flash 引擎，
+    # 进度写入 progress 通道，由界面线程通过 poll_progress 轮询，这里不直接操作任何控件
+    from name_flash import NameVideoRenderer, RenderConfig
+    config = RenderConfig(
+        name_file_path=name_file_path,
+        font_path=font_path,
+        output_path=output_path,
+        fps=fps,
+        frame_size=frame_size,
+        interval=interval,
+        text_size=text_size,
+        text_color=text_color,
+        bg_type=bg_type,
+        bg_value=bg_value,
+        bg_fit=bg_fit,
+        cache_dir=cache_dir,
+        auto_fit=auto_fit,
+    )
     try:
-        with open(name_file_path, 'r', encoding='utf-8') as f:
-            names = f.read().splitlines()
-
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
-
-        font = ImageFont.truetype(font_path, text_size)
-
-        frames_per_name = int(interval * fps)
-        total_frames = len(names) * frames_per_name
-        current_frame = 0
-
-        for name in names:
-            if bg_type == '纯色':
-                img = Image.new('RGB', frame_size, color=bg_value)
-            elif bg_type == '图片':
-                try:
-                    bg_img = Image.open(bg_value)
-                    # 确保图片按比例调整大小并填充整个帧
-                    bg_img = bg_img.resize(frame_size, Image.LANCZOS)
-                    img = bg_img.copy()
-                except Exception as e:
-                    print(f"加载图片失败: {e}")
-                    img = Image.new('RGB', frame_size, color=(0, 0, 0))
-            elif bg_type == '视频（循环播放）':
-                cap = cv2.VideoCapture(bg_value)
-                # 获取视频总帧数
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                if frame_count > 0:
-                    # 为当前名字随机选择一个起始帧
-                    start_frame = random.randint(0, frame_count - 1)
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-                    ret, bg_frame = cap.read()
-                    if not ret:
-                        # 如果读取失败，尝试读取第一帧
-                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                        ret, bg_frame = cap.read()
-                    if ret:
-                        bg_frame = cv2.resize(bg_frame, frame_size)
-                        bg_frame = cv2.cvtColor(bg_frame, cv2.COLOR_BGR2RGB)
-                        img = Image.fromarray(bg_frame)
-                    else:
-                        img = Image.new('RGB', frame_size, color=(0, 0, 0))
-                else:
-                    img = Image.new('RGB', frame_size, color=(0, 0, 0))
-                cap.release()
-
-            draw = ImageDraw.Draw(img)
-            bbox = draw.textbbox((0, 0), name, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            text_x = (frame_size[0] - text_width) // 2
-            text_y = (frame_size[1] - text_height) // 2
-
-            draw.text((text_x, text_y), name, font=font, fill=text_color)
-
-            img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-
-            for _ in range(frames_per_name):
-                out.write(img_cv)
-                current_frame += 1
-                progress = (current_frame / total_frames) * 100
-                progress_var.set(progress)
-                root.update_idletasks()
-
-        out.release()
-        messagebox.showinfo("成功", "视频生成成功！")
+        NameVideoRenderer(config, progress=progress).render()
     except Exception as e:
-        messagebox.showerror("错误", f"视频生成失败：{str(e)}")
-    finally:
-        generate_button.config(state=tk.NORMAL)
-        progress_bar.stop()
+        result['error'] = e
+
+
+def poll_progress(thread, progress, result):
+    # 由 root.after 在界面线程中定期调用，刷新进度条与状态文字
+    event = progress.snapshot()
+    progress_var.set(event.percent)
+    if event.current_name is not None:
+        status_var.set(f"{event.frames_per_sec:.0f} 帧/秒  剩余 {format_seconds(event.eta_seconds)}"
+                       f"  当前：{event.current_name}")
+    if thread.is_alive():
+        root.after(PROGRESS_POLL_MS, poll_progress, thread, progress, result)
+        return
+
+    generate_button.config(state=tk.NORMAL)
+    cancel_button.config(state=tk.DISABLED)
+    if result.get('error') is None:
+        progress_var.set(100)
+        messagebox.showinfo("成功", "视频生成成功！")
+    elif isinstance(result['error'], RenderCancelled):
+        status_var.set("已取消")
+        messagebox.showinfo("已取消", "视频生成已取消。")
+    else:
+        messagebox.showerror("错误", f"视频生成失败：{str(result['error'])}")
 
 
 def select_font_file():
@@ -198,9 +193,9 @@ def select_output_path():
 
 def select_bg_file():
     bg_type = bg_type_var.get()
-    if bg_type == '图片':
+    if bg_type == BG_IMAGE:
         bg_path = filedialog.askopenfilename(filetypes=[("Image files", "*.png;*.jpg;*.jpeg")])
-    elif bg_type == '视频（存在bug，有能力的解决）':
+    elif bg_type == BG_VIDEO:
         bg_path = filedialog.askopenfilename(filetypes=[("Video files", "*.mp4;*.avi")])
     else:
         return
@@ -209,6 +204,13 @@ def select_bg_file():
         bg_entry.insert(0, bg_path)
 
 
+def select_cache_dir():
+    cache_dir = filedialog.askdirectory()
+    if cache_dir:
+        cache_entry.delete(0, tk.END)
+        cache_entry.insert(0, cache_dir)
+
+
 def choose_text_color():
     color = colorchooser.askcolor()[1]
     if color:
@@ -218,7 +220,7 @@ def choose_text_color():
 
 def choose_bg_color():
     # 确保只有在纯色背景模式下才打开颜色选择器
-    if bg_type_var.get() == '纯色':
+    if bg_type_var.get() == BG_SOLID:
         color = colorchooser.askcolor()[1]
         if color:
             bg_entry.delete(0, tk.END)
@@ -246,6 +248,10 @@ def generate_video():
     text_color = text_color_entry.get()
     bg_type = bg_type_var.get()
     bg_value = bg_entry.get()
+    bg_fit = BG_FIT_OPTIONS[bg_fit_var.get()]
+    # 留空表示不使用渲染缓存
+    cache_dir = cache_entry.get().strip() or None
+    auto_fit = auto_fit_var.get()
 
     if not all([font_path, name_file_path, output_path, fps_str, width_str, height_str, interval_str,
                 text_size_str, text_color]):
@@ -266,17 +272,139 @@ def generate_video():
         messagebox.showerror("文件不存在", "字体文件或姓名文件不存在，请检查路径！")
         return
 
-    if bg_type in ['图片', '视频（存在bug，有能力的解决）'] and not os.path.exists(bg_value):
+    if bg_type in [BG_IMAGE, BG_VIDEO] and not os.path.exists(bg_value):
         messagebox.showerror("文件不存在", f"{bg_type}文件不存在，请检查路径！")
         return
 
+    global current_progress
     generate_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
     progress_var.set(0)
-    progress_bar.start()
+    status_var.set("")
+    progress = current_progress = ProgressChannel()
+    result = {}
     thread = threading.Thread(target=generate_name_video, args=(
         name_file_path, font_path, output_path, fps, (width, height), interval,
-        text_size, text_color, bg_type, bg_value, progress_var, root))
+        text_size, text_color, bg_type, bg_value, progress, result, bg_fit, cache_dir, auto_fit), daemon=True)
     thread.start()
+    root.after(PROGRESS_POLL_MS, poll_progress, thread, progress, result)
+
+
+def cancel_video():
+    # 只通知渲染线程停止，线程结束后由 poll_progress 恢复按钮状态
+    if current_progress is not None:
+        current_progress.cancel()
+        cancel_button.config(state=tk.DISABLED)
+        status_var.set("正在取消...")
+
+
+def preload_engine():
+    # 在后台线程中导入渲染引擎（numpy、PIL 等），不阻塞界面；导入失败时留到生成视频时再报告
+    def load():
+        try:
+            import name_flash.engine  # noqa: F401
+        except Exception:
+            pass
+    threading.Thread(target=load, daemon=True).start()
+
+
+def read_preview_settings():
+    # 读取当前输入框中的设置；正在输入、还不完整时返回 None，不报错
+    font_path = font_entry.get()
+    if not os.path.isfile(font_path):
+        return None
+    try:
+        frame_size = (int(width_entry.get()), int(height_entry.get()))
+        text_size = int(text_size_entry.get())
+    except ValueError:
+        return None
+    if min(frame_size) <= 0 or text_size <= 0:
+        return None
+    return dict(
+        name_file_path=name_entry.get(),
+        font_path=font_path,
+        output_path='',
+        frame_size=frame_size,
+        text_size=text_size,
+        text_color=text_color_entry.get(),
+        bg_type=bg_type_var.get(),
+        bg_value=bg_entry.get(),
+        bg_fit=BG_FIT_OPTIONS[bg_fit_var.get()],
+        auto_fit=auto_fit_var.get(),
+    )
+
+
+def preview_loop():
+    # 在后台线程中渲染预览，界面线程不做任何渲染；字体、背景等缓存在 PreviewRenderer 中一直保留
+    from name_flash import RenderConfig
+    from name_flash.preview import PreviewRenderer
+    renderer = PreviewRenderer()
+    while True:
+        seq, settings = preview_requests.get()
+        try:
+            preview_results.put((seq, renderer.render(RenderConfig(**settings)), None))
+        except Exception as e:
+            preview_results.put((seq, None, e))
+
+
+def schedule_preview(*args):
+    # 输入每次变化都重新计时，停止输入 PREVIEW_DEBOUNCE_MS 毫秒后才提交预览
+    global preview_after_id
+    if preview_after_id is not None:
+        root.after_cancel(preview_after_id)
+    preview_after_id = root.after(PREVIEW_DEBOUNCE_MS, request_preview)
+
+
+def request_preview():
+    global preview_after_id, preview_thread, preview_seq, preview_settings, preview_polling
+    preview_after_id = None
+    settings = read_preview_settings()
+    if settings is None:
+        preview_info_var.set("选择字体文件并填写有效的分辨率和文字大小后显示预览")
+        return
+    if settings == preview_settings:
+        return
+    preview_settings = settings
+    preview_seq += 1
+    # 还没开始渲染的旧请求直接丢弃，只渲染最新的设置
+    try:
+        preview_requests.get_nowait()
+    except queue.Empty:
+        pass
+    preview_requests.put((preview_seq, settings))
+    if preview_thread is None:
+        preview_thread = threading.Thread(target=preview_loop, daemon=True)
+        preview_thread.start()
+    if not preview_polling:
+        preview_polling = True
+        root.after(PREVIEW_POLL_MS, poll_preview)
+
+
+def poll_preview():
+    # 取出最新的预览结果并显示，等到最后一次请求的结果到达后停止轮询
+    global preview_polling
+    latest = None
+    while True:
+        try:
+            latest = preview_results.get_nowait()
+        except queue.Empty:
+            break
+    if latest is not None:
+        seq, frame, error = latest
+        if error is not None:
+            preview_info_var.set(f"预览失败：{error}")
+        else:
+            from PIL import Image, ImageTk
+            photo = ImageTk.PhotoImage(Image.fromarray(frame.rgb))
+            preview_label.configure(image=photo)
+            preview_label.image = photo
+            width, height = frame.frame_size
+            preview_info_var.set(f"{frame.name}  {width}x{height}（按 {frame.render_size[0]}x{frame.render_size[1]} 渲染）"
+                                 f"  {frame.seconds * 1000:.0f} 毫秒")
+    if latest is None or latest[0] != preview_seq:
+        root.after(PREVIEW_POLL_MS, poll_preview)
+    else:
+        preview_polling = False
 
 
 def open_github():
@@ -369,182 +497,241 @@ def update_theme(colors):
     # 更新标题颜色
     title_label.configure(foreground=colors['accent'])
     copyright_label.configure(foreground=colors['text_light'])
+    status_label.configure(foreground=colors['text_light'])
+    preview_info_label.configure(foreground=colors['text_light'])
     github_link.configure(foreground=colors['accent'])
 
 
-# 创建主窗口
-root = tk.Tk()
-root.title("名字闪烁视频生成器")
-root.geometry("850x650")
-root.minsize(800, 600)
-
-# 设置Win11风格
-if is_windows:
-    try:
-        # 对于Windows 11，启用毛玻璃效果和圆角
-        hwnd = ctypes.windll.user32.GetParent(root.winfo_id())
-        enable_mica_effect(hwnd)
-        set_window_corner(hwnd, 2)  # 2 = 圆角
-    except:
-        pass
-
-# 创建自定义样式
-style = ttk.Style()
-style.theme_use('clam')
-
-# 创建主框架
-main_frame = ttk.Frame(root, padding=20)
-main_frame.pack(fill=tk.BOTH, expand=True)
-
-# 添加标题
-title_label = ttk.Label(main_frame, text="名字闪烁视频生成器", 
-                       font=('Segoe UI', 16, 'bold'),
-                       style='Win11.TLabel')
-title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
-
-# 字体文件选择
-ttk.Label(main_frame, text="字体文件位置（ttf）:", style='Win11.TLabel').grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
-font_entry = ttk.Entry(main_frame, width=50, style='Win11.TEntry')
-font_entry.grid(row=1, column=1, padx=10, pady=10, sticky=tk.EW)
-font_button = ttk.Button(main_frame, text="浏览...", command=select_font_file, style='Win11.TButton')
-font_button.grid(row=1, column=2, padx=10, pady=10)
-
-# 姓名文件选择
-ttk.Label(main_frame, text="姓名文件位置（txt）:", style='Win11.TLabel').grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
-name_entry = ttk.Entry(main_frame, width=50, style='Win11.TEntry')
-name_entry.grid(row=2, column=1, padx=10, pady=10, sticky=tk.EW)
-name_button = ttk.Button(main_frame, text="浏览...", command=select_name_file, style='Win11.TButton')
-name_button.grid(row=2, column=2, padx=10, pady=10)
-
-# FPS 输入
-ttk.Label(main_frame, text="帧率（FPS）:", style='Win11.TLabel').grid(row=3, column=0, padx=10, pady=10, sticky=tk.W)
-fps_entry = ttk.Entry(main_frame, width=10, style='Win11.TEntry')
-fps_entry.insert(0, "30")
-fps_entry.grid(row=3, column=1, padx=10, pady=10, sticky=tk.W)
-
-# 分辨率输入
-# 宽度
-width_frame = ttk.Frame(main_frame, style='Win11.TFrame')
-width_frame.grid(row=4, column=0, padx=10, pady=10, sticky=tk.W)
-
-ttk.Label(width_frame, text="分辨率  宽度:", style='Win11.TLabel').pack(side=tk.LEFT)
-width_entry = ttk.Entry(width_frame, width=10, style='Win11.TEntry')
-width_entry.insert(0, "192")
-width_entry.pack(side=tk.LEFT, padx=(5, 0))
-ttk.Label(width_frame, text="像素", style='Win11.TLabel').pack(side=tk.LEFT, padx=(5, 10))
-
-# 高度
-height_frame = ttk.Frame(main_frame, style='Win11.TFrame')
-height_frame.grid(row=4, column=1, padx=10, pady=10, sticky=tk.W)
-
-ttk.Label(height_frame, text="高度:", style='Win11.TLabel').pack(side=tk.LEFT)
-height_entry = ttk.Entry(height_frame, width=10, style='Win11.TEntry')
-height_entry.insert(0, "108")
-height_entry.pack(side=tk.LEFT, padx=(5, 0))
-ttk.Label(height_frame, text="像素", style='Win11.TLabel').pack(side=tk.LEFT, padx=(5, 0))
-
-# 名字停留时间输入
-ttk.Label(main_frame, text="名字停留时间 (秒):", style='Win11.TLabel').grid(row=5, column=0, padx=10, pady=10, sticky=tk.W)
-interval_entry = ttk.Entry(main_frame, width=10, style='Win11.TEntry')
-interval_entry.insert(0, "0.2")
-interval_entry.grid(row=5, column=1, padx=10, pady=10, sticky=tk.W)
-
-# 输出路径选择
-ttk.Label(main_frame, text="视频输出路径:", style='Win11.TLabel').grid(row=6, column=0, padx=10, pady=10, sticky=tk.W)
-output_entry = ttk.Entry(main_frame, width=50, style='Win11.TEntry')
-output_entry.grid(row=6, column=1, padx=10, pady=10, sticky=tk.EW)
-output_button = ttk.Button(main_frame, text="浏览...", command=select_output_path, style='Win11.TButton')
-output_button.grid(row=6, column=2, padx=10, pady=10)
-
-# 高级选项按钮
-advanced_button = ttk.Button(main_frame, text="展开高级选项", command=toggle_advanced_options, style='Win11.TButton')
-advanced_button.grid(row=7, column=0, columnspan=3, pady=10)
-
-# 高级选项框架
-advanced_frame = ttk.Frame(main_frame, style='Win11.TFrame')
-
-# 文字大小
-ttk.Label(advanced_frame, text="文字大小:", style='Win11.TLabel').grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-text_size_entry = ttk.Entry(advanced_frame, width=10, style='Win11.TEntry')
-text_size_entry.insert(0, "70")
-text_size_entry.grid(row=0, column=1, padx=10, pady=5, sticky=tk.W)
-
-# 文字颜色
-ttk.Label(advanced_frame, text="文字颜色:", style='Win11.TLabel').grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-text_color_entry = ttk.Entry(advanced_frame, width=10, style='Win11.TEntry')
-text_color_entry.insert(0, "#ffffff")
-text_color_entry.grid(row=1, column=1, padx=10, pady=5, sticky=tk.W)
-color_button = ttk.Button(advanced_frame, text="选择颜色", command=choose_text_color, style='Win11.TButton')
-color_button.grid(row=1, column=2, padx=10, pady=5)
-
-# 背景类型
-ttk.Label(advanced_frame, text="背景类型:", style='Win11.TLabel').grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-bg_type_var = tk.StringVar()
-bg_type_var.set("纯色")
-bg_type_menu = ttk.Combobox(advanced_frame, textvariable=bg_type_var, 
-                           values=["纯色", "图片", "视频（暂不支持）"],
-                           state="readonly", style='Win11.TCombobox')
-bg_type_menu.grid(row=2, column=1, padx=10, pady=5, sticky=tk.W)
-
-# 背景值
-ttk.Label(advanced_frame, text="背景值:", style='Win11.TLabel').grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
-bg_entry = ttk.Entry(advanced_frame, width=50, style='Win11.TEntry')
-bg_entry.insert(0, "#000000")
-bg_entry.grid(row=3, column=1, padx=10, pady=5, sticky=tk.EW)
-
-# 为纯色背景添加颜色选择按钮
-color_frame = ttk.Frame(advanced_frame)
-color_frame.grid(row=3, column=2, padx=10, pady=5)
-
-bg_button = ttk.Button(color_frame, text="选择文件", command=select_bg_file, style='Win11.TButton')
-bg_button.pack(side=tk.LEFT, padx=(0, 5))
-
-choose_bg_color_button = ttk.Button(color_frame, text="选择颜色", command=choose_bg_color, style='Win11.TButton')
-choose_bg_color_button.pack(side=tk.LEFT)
-
-# 生成按钮
-generate_button = ttk.Button(main_frame, text="生成视频", command=generate_video, style='Win11.TButton')
-generate_button.grid(row=8, column=0, columnspan=3, pady=20)
-
-# 进度条
-progress_var = tk.DoubleVar()
-progress_bar = ttk.Progressbar(main_frame, variable=progress_var, maximum=100, style='Win11.Horizontal.TProgressbar')
-progress_bar.grid(row=9, column=0, columnspan=3, padx=10, pady=10, sticky=tk.EW)
-
-# 添加右下角版权信息
-copyright_label = ttk.Label(main_frame, text="By:Lun.", style='Win11.TLabel')
-copyright_label.grid(row=10, column=2, sticky="se", padx=10, pady=10)
-
-# 添加左下角GitHub链接
-github_link = ttk.Label(main_frame, text="GitHub", cursor="hand2", style='Win11.TLabel')
-github_link.grid(row=10, column=0, sticky="sw", padx=10, pady=10)
-github_link.bind("<Button-1>", lambda e: open_github())
-
-# 配置列权重，使界面可以自适应调整
-main_frame.columnconfigure(1, weight=1)
-advanced_frame.columnconfigure(1, weight=1)
-
-# 设置行权重
-for i in range(11):
-    main_frame.rowconfigure(i, weight=1)
-
-for i in range(4):
-    advanced_frame.rowconfigure(i, weight=1)
-
-# 添加主题切换按钮（使用昼夜图标）
-theme_button = ttk.Button(main_frame, text="🌙", command=lambda: switch_theme(current_theme == "light"), style='Win11.TButton')
-theme_button.grid(row=0, column=2, padx=10, pady=10, sticky="ne")
-
-def update_theme_icon():
-    if current_theme == "light":
-        theme_button.config(text="🌙")
-    else:
-        theme_button.config(text="☀️")
+# 多进程渲染的子进程会重新导入本模块（Windows 的 spawn 方式），界面只在直接运行时创建
+if __name__ == '__main__':
+    # 创建主窗口
+    root = tk.Tk()
+    root.title("名字闪烁视频生成器")
+    root.geometry("1250x650")
+    root.minsize(1200, 600)
+
+    # 设置Win11风格
+    if is_windows:
+        try:
+            # 对于Windows 11，启用毛玻璃效果和圆角
+            hwnd = ctypes.windll.user32.GetParent(root.winfo_id())
+            enable_mica_effect(hwnd)
+            set_window_corner(hwnd, 2)  # 2 = 圆角
+        except:
+            pass
 
-# 初始化主题 - 强制使用白色主题
-current_theme = None
-apply_light_theme()
-update_theme_icon()
+    # 创建自定义样式
+    style = ttk.Style()
+    style.theme_use('clam')
+
+    # 创建主框架
+    main_frame = ttk.Frame(root, padding=20)
+    main_frame.pack(fill=tk.BOTH, expand=True)
+
+    # 添加标题
+    title_label = ttk.Label(main_frame, text="名字闪烁视频生成器", 
+                           font=('Segoe UI', 16, 'bold'),
+                           style='Win11.TLabel')
+    title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
+
+    # 实时预览：修改设置后在后台按缩小的分辨率渲染一帧
+    preview_frame = ttk.Frame(main_frame, style='Win11.TFrame')
+    preview_frame.grid(row=1, column=3, rowspan=7, padx=10, pady=10, sticky="n")
+    preview_label = ttk.Label(preview_frame, style='Win11.TLabel')
+    preview_label.pack()
+    preview_info_var = tk.StringVar()
+    preview_info_label = ttk.Label(preview_frame, textvariable=preview_info_var, wraplength=384, style='Win11.TLabel')
+    preview_info_label.pack(pady=(5, 0))
+
+    # 字体文件选择
+    ttk.Label(main_frame, text="字体文件位置（ttf）:", style='Win11.TLabel').grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
+    font_entry = ttk.Entry(main_frame, width=50, style='Win11.TEntry')
+    font_entry.grid(row=1, column=1, padx=10, pady=10, sticky=tk.EW)
+    font_button = ttk.Button(main_frame, text="浏览...", command=select_font_file, style='Win11.TButton')
+    font_button.grid(row=1, column=2, padx=10, pady=10)
+
+    # 姓名文件选择
+    ttk.Label(main_frame, text="姓名文件位置（txt）:", style='Win11.TLabel').grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
+    name_entry = ttk.Entry(main_frame, width=50, style='Win11.TEntry')
+    name_entry.grid(row=2, column=1, padx=10, pady=10, sticky=tk.EW)
+    name_button = ttk.Button(main_frame, text="浏览...", command=select_name_file, style='Win11.TButton')
+    name_button.grid(row=2, column=2, padx=10, pady=10)
+
+    # FPS 输入
+    ttk.Label(main_frame, text="帧率（FPS）:", style='Win11.TLabel').grid(row=3, column=0, padx=10, pady=10, sticky=tk.W)
+    fps_entry = ttk.Entry(main_frame, width=10, style='Win11.TEntry')
+    fps_entry.insert(0, "30")
+    fps_entry.grid(row=3, column=1, padx=10, pady=10, sticky=tk.W)
+
+    # 分辨率输入
+    # 宽度
+    width_frame = ttk.Frame(main_frame, style='Win11.TFrame')
+    width_frame.grid(row=4, column=0, padx=10, pady=10, sticky=tk.W)
+
+    ttk.Label(width_frame, text="分辨率  宽度:", style='Win11.TLabel').pack(side=tk.LEFT)
+    width_entry = ttk.Entry(width_frame, width=10, style='Win11.TEntry')
+    width_entry.insert(0, "192")
+    width_entry.pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Label(width_frame, text="像素", style='Win11.TLabel').pack(side=tk.LEFT, padx=(5, 10))
+
+    # 高度
+    height_frame = ttk.Frame(main_frame, style='Win11.TFrame')
+    height_frame.grid(row=4, column=1, padx=10, pady=10, sticky=tk.W)
+
+    ttk.Label(height_frame, text="高度:", style='Win11.TLabel').pack(side=tk.LEFT)
+    height_entry = ttk.Entry(height_frame, width=10, style='Win11.TEntry')
+    height_entry.insert(0, "108")
+    height_entry.pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Label(height_frame, text="像素", style='Win11.TLabel').pack(side=tk.LEFT, padx=(5, 0))
+
+    # 名字停留时间输入
+    ttk.Label(main_frame, text="名字停留时间 (秒):", style='Win11.TLabel').grid(row=5, column=0, padx=10, pady=10, sticky=tk.W)
+    interval_entry = ttk.Entry(main_frame, width=10, style='Win11.TEntry')
+    interval_entry.insert(0, "0.2")
+    interval_entry.grid(row=5, column=1, padx=10, pady=10, sticky=tk.W)
+
+    # 输出路径选择
+    ttk.Label(main_frame, text="视频输出路径:", style='Win11.TLabel').grid(row=6, column=0, padx=10, pady=10, sticky=tk.W)
+    output_entry = ttk.Entry(main_frame, width=50, style='Win11.TEntry')
+    output_entry.grid(row=6, column=1, padx=10, pady=10, sticky=tk.EW)
+    output_button = ttk.Button(main_frame, text="浏览...", command=select_output_path, style='Win11.TButton')
+    output_button.grid(row=6, column=2, padx=10, pady=10)
+
+    # 高级选项按钮
+    advanced_button = ttk.Button(main_frame, text="展开高级选项", command=toggle_advanced_options, style='Win11.TButton')
+    advanced_button.grid(row=7, column=0, columnspan=3, pady=10)
+
+    # 高级选项框架
+    advanced_frame = ttk.Frame(main_frame, style='Win11.TFrame')
+
+    # 文字大小
+    ttk.Label(advanced_frame, text="文字大小:", style='Win11.TLabel').grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
+    text_size_entry = ttk.Entry(advanced_frame, width=10, style='Win11.TEntry')
+    text_size_entry.insert(0, "70")
+    text_size_entry.grid(row=0, column=1, padx=10, pady=5, sticky=tk.W)
+
+    # 文字颜色
+    ttk.Label(advanced_frame, text="文字颜色:", style='Win11.TLabel').grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
+    text_color_entry = ttk.Entry(advanced_frame, width=10, style='Win11.TEntry')
+    text_color_entry.insert(0, "#ffffff")
+    text_color_entry.grid(row=1, column=1, padx=10, pady=5, sticky=tk.W)
+    color_button = ttk.Button(advanced_frame, text="选择颜色", command=choose_text_color, style='Win11.TButton')
+    color_button.grid(row=1, column=2, padx=10, pady=5)
+
+    # 背景类型
+    ttk.Label(advanced_frame, text="背景类型:", style='Win11.TLabel').grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
+    bg_type_var = tk.StringVar()
+    bg_type_var.set(BG_SOLID)
+    bg_type_menu = ttk.Combobox(advanced_frame, textvariable=bg_type_var, 
+                               values=[BG_SOLID, BG_IMAGE, BG_VIDEO],
+                               state="readonly", style='Win11.TCombobox')
+    bg_type_menu.grid(row=2, column=1, padx=10, pady=5, sticky=tk.W)
+
+    # 背景值
+    ttk.Label(advanced_frame, text="背景值:", style='Win11.TLabel').grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
+    bg_entry = ttk.Entry(advanced_frame, width=50, style='Win11.TEntry')
+    bg_entry.insert(0, "#000000")
+    bg_entry.grid(row=3, column=1, padx=10, pady=5, sticky=tk.EW)
+
+    # 为纯色背景添加颜色选择按钮
+    color_frame = ttk.Frame(advanced_frame)
+    color_frame.grid(row=3, column=2, padx=10, pady=5)
+
+    bg_button = ttk.Button(color_frame, text="选择文件", command=select_bg_file, style='Win11.TButton')
+    bg_button.pack(side=tk.LEFT, padx=(0, 5))
+
+    choose_bg_color_button = ttk.Button(color_frame, text="选择颜色", command=choose_bg_color, style='Win11.TButton')
+    choose_bg_color_button.pack(side=tk.LEFT)
+
+    # 图片填充方式
+    BG_FIT_OPTIONS = {"拉伸": FIT_STRETCH, "裁剪铺满": FIT_COVER, "完整显示": FIT_CONTAIN}
+    ttk.Label(advanced_frame, text="图片填充方式:", style='Win11.TLabel').grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
+    bg_fit_var = tk.StringVar()
+    bg_fit_var.set("拉伸")
+    bg_fit_menu = ttk.Combobox(advanced_frame, textvariable=bg_fit_var,
+                               values=list(BG_FIT_OPTIONS),
+                               state="readonly", style='Win11.TCombobox')
+    bg_fit_menu.grid(row=4, column=1, padx=10, pady=5, sticky=tk.W)
+
+    # 渲染缓存目录（可选，需要 ffmpeg）：重新生成时只编码名单中变化的部分
+    ttk.Label(advanced_frame, text="渲染缓存目录（可选）:", style='Win11.TLabel').grid(row=5, column=0, padx=10, pady=5, sticky=tk.W)
+    cache_entry = ttk.Entry(advanced_frame, width=50, style='Win11.TEntry')
+    cache_entry.grid(row=5, column=1, padx=10, pady=5, sticky=tk.EW)
+    cache_button = ttk.Button(advanced_frame, text="选择", command=select_cache_dir, style='Win11.TButton')
+    cache_button.grid(row=5, column=2, padx=10, pady=5)
+
+    # 名字过长时自动缩小字号，保证完整显示在画面内（文字大小作为上限）
+    auto_fit_var = tk.BooleanVar(value=False)
+    auto_fit_check = ttk.Checkbutton(advanced_frame, text="自动缩小过长的名字", variable=auto_fit_var)
+    auto_fit_check.grid(row=6, column=1, padx=10, pady=5, sticky=tk.W)
+
+    # 生成/取消按钮
+    button_frame = ttk.Frame(main_frame, style='Win11.TFrame')
+    button_frame.grid(row=8, column=0, columnspan=3, pady=20)
+
+    generate_button = ttk.Button(button_frame, text="生成视频", command=generate_video, style='Win11.TButton')
+    generate_button.pack(side=tk.LEFT, padx=(0, 10))
+
+    cancel_button = ttk.Button(button_frame, text="取消", command=cancel_video, state=tk.DISABLED, style='Win11.TButton')
+    cancel_button.pack(side=tk.LEFT)
+
+    # 进度条
+    progress_var = tk.DoubleVar()
+    progress_bar = ttk.Progressbar(main_frame, variable=progress_var, maximum=100, style='Win11.Horizontal.TProgressbar')
+    progress_bar.grid(row=9, column=0, columnspan=3, padx=10, pady=10, sticky=tk.EW)
+
+    # 进度状态（帧率、剩余时间、当前名字）
+    status_var = tk.StringVar()
+    status_label = ttk.Label(main_frame, textvariable=status_var, style='Win11.TLabel')
+    status_label.grid(row=10, column=1, sticky="s", padx=10, pady=10)
+
+    # 添加右下角版权信息
+    copyright_label = ttk.Label(main_frame, text="By:Lun.", style='Win11.TLabel')
+    copyright_label.grid(row=10, column=2, sticky="se", padx=10, pady=10)
+
+    # 添加左下角GitHub链接
+    github_link = ttk.Label(main_frame, text="GitHub", cursor="hand2", style='Win11.TLabel')
+    github_link.grid(row=10, column=0, sticky="sw", padx=10, pady=10)
+    github_link.bind("<Button-1>", lambda e: open_github())
+
+    # 配置列权重，使界面可以自适应调整
+    main_frame.columnconfigure(1, weight=1)
+    advanced_frame.columnconfigure(1, weight=1)
+
+    # 设置行权重
+    for i in range(11):
+        main_frame.rowconfigure(i, weight=1)
+
+    for i in range(7):
+        advanced_frame.rowconfigure(i, weight=1)
+
+    # 添加主题切换按钮（使用昼夜图标）
+    theme_button = ttk.Button(main_frame, text="🌙", command=lambda: switch_theme(current_theme == "light"), style='Win11.TButton')
+    theme_button.grid(row=0, column=3, padx=10, pady=10, sticky="ne")
+
+    def update_theme_icon():
+        if current_theme == "light":
+            theme_button.config(text="🌙")
+        else:
+            theme_button.config(text="☀️")
+
+    # 初始化主题 - 强制使用白色主题
+    current_theme = None
+    apply_light_theme()
+    update_theme_icon()
 
-# 运行主循环
-root.mainloop()
+    # 任何影响画面的设置变化都会刷新预览（包括通过“浏览”“选择颜色”填入的内容）
+    preview_vars = []
+    for entry in (font_entry, name_entry, width_entry, height_entry, text_size_entry, text_color_entry, bg_entry):
+        var = tk.StringVar(value=entry.get())
+        entry.configure(textvariable=var)
+        preview_vars.append(var)
+    for var in preview_vars + [bg_type_var, bg_fit_var, auto_fit_var]:
+        var.trace_add('write', schedule_preview)
+
+    # 窗口显示后再在后台导入渲染引擎，然后显示第一次预览
+    root.after(ENGINE_PRELOAD_DELAY_MS, preload_engine)
+    root.after(ENGINE_PRELOAD_DELAY_MS, schedule_preview)
+
+    # 运行主循环
+    root.mainloop()
@@ -0,0 +1,40 @@
+"""名字闪烁视频生成器的渲染引擎（不依赖 tkinter，可在无界面环境中使用）。
+
+包中的名字按需导入：常量和进度相关的类不会加载 numpy、PIL 或 OpenCV，
+第一次访问渲染器等类时才导入对应的子模块，界面和命令行可以更快启动。
+"""
+import importlib
+
+# 对外提供的名字 -> 所在的子模块
+_EXPORTS = {
+    'BG_IMAGE': 'constants', 'BG_SOLID': 'constants', 'BG_TYPES': 'constants', 'BG_VIDEO': 'constants',
+    'FIT_CONTAIN': 'constants', 'FIT_COVER': 'constants', 'FIT_MODES': 'constants', 'FIT_STRETCH': 'constants',
+    'ProgressChannel': 'progress', 'ProgressEvent': 'progress', 'RenderCancelled': 'progress',
+    'FontPool': 'autosize', 'TextFitter': 'autosize',
+    'PreviewRenderer': 'preview',
+    'PreparedBackground': 'background', 'VideoBackgroundSource': 'background',
+    'RenderCache': 'cache',
+    'NameVideoRenderer': 'engine', 'RenderConfig': 'engine',
+    'FrameBuffer': 'frame',
+    'SharedResources': 'resources',
+    'OutputTarget': 'targets',
+    'GlyphAtlas': 'text', 'TextLayer': 'text', 'TextLayerCache': 'text', 'blend_layer': 'text',
+    'RawStreamReader': 'stream', 'RawStreamWriter': 'stream', 'SharedMemoryReader': 'stream',
+    'SharedMemoryWriter': 'stream', 'StreamInfo': 'stream',
+    'FFmpegWriter': 'writers', 'FrameWriter': 'writers', 'OpenCVWriter': 'writers', 'create_writer': 'writers',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
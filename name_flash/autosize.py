@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+from PIL import ImageFont
+
+from .constants import DEFAULT_FIT_MARGIN, DEFAULT_MIN_TEXT_SIZE
+
+# 名字 -> 字号、(名字, 字号) -> 包围盒 两个记忆表的条目上限
+MAX_FIT_ENTRIES = 1 << 16
+
+
+class FontPool:
+    """按字号缓存同一字体文件的 ImageFont.truetype 实例，每个字号只打开一次字体文件。"""
+
+    def __init__(self, font_path):
+        self.font_path = font_path
+        self._fonts = {}
+
+    def __call__(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = ImageFont.truetype(self.font_path, size)
+        return font
+
+
+class TextFitter:
+    """为每个名字选择能完整放进画面（留出边距）的最大字号，上限为 max_size。
+
+    文字宽度大致与字号成正比，先用最大字号的包围盒按比例估计字号，再逐级微调，
+    通常只需测量一两次。测量结果和每个名字选定的字号都会被记住，重复的名字不再测量。
+    font_for_size(size) 返回对应字号的字体（例如 FontPool 或 SharedResources.font）。
+    """
+
+    def __init__(self, font_for_size, frame_size, max_size, min_size=DEFAULT_MIN_TEXT_SIZE,
+                 margin=DEFAULT_FIT_MARGIN, max_entries=MAX_FIT_ENTRIES):
+        self.font_for_size = font_for_size
+        self.frame_size = frame_size
+        self.max_size = max_size
+        self.min_size = max(1, min(min_size, max_size))
+        self.margin_x = round(frame_size[0] * margin)
+        self.margin_y = round(frame_size[1] * margin)
+        self.max_entries = max_entries
+        self._bboxes = OrderedDict()
+        self._sizes = OrderedDict()
+        self.measurements = 0
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    def bbox(self, text, size):
+        key = (text, size)
+        bbox = self._bboxes.get(key)
+        if bbox is None:
+            self.measurements += 1
+            bbox = self.font_for_size(size).getbbox(text)
+            self._remember(self._bboxes, key, bbox)
+        else:
+            self._bboxes.move_to_end(key)
+        return bbox
+
+    def fits(self, text, size):
+        # 按与渲染相同的居中方式计算墨迹的实际位置，判断是否落在边距以内
+        left, top, right, bottom = self.bbox(text, size)
+        width, height = self.frame_size
+        x = (width - (right - left)) // 2
+        y = (height - (bottom - top)) // 2
+        return (x + left >= self.margin_x and x + right <= width - self.margin_x
+                and y + top >= self.margin_y and y + bottom <= height - self.margin_y)
+
+    def size_for(self, text):
+        size = self._sizes.get(text)
+        if size is not None:
+            self._sizes.move_to_end(text)
+            return size
+        size = self.max_size
+        if not self.fits(text, size):
+            left, top, right, bottom = self.bbox(text, size)
+            scale = min((self.frame_size[0] - 2 * self.margin_x) / max(1, right - left),
+                        (self.frame_size[1] - 2 * self.margin_y) / max(1, bottom - top))
+            size = max(self.min_size, min(self.max_size - 1, int(self.max_size * scale)))
+            while size > self.min_size and not self.fits(text, size):
+                size -= 1
+            while size + 1 < self.max_size and self.fits(text, size + 1):
+                size += 1
+        self._remember(self._sizes, text, size)
+        return size
+
+    def font_for(self, text):
+        return self.font_for_size(self.size_for(text))
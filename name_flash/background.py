@@ -0,0 +1,251 @@
+import queue
+import random
+import sys
+import threading
+
+import numpy as np
+from PIL import Image
+
+from .constants import FIT_CONTAIN, FIT_COVER, FIT_MODES, FIT_STRETCH  # noqa: F401
+
+
+def resolve_seed(seed, random_start=True):
+    """需要在多处复现同一个随机起点时（分段、分块、多输出），把未指定的随机种子固定为同一个随机值。"""
+    if seed is None and random_start:
+        seed = random.randrange(1 << 31)
+    return seed
+
+
+def fit_image(img, frame_size, fit=FIT_STRETCH, fill=(0, 0, 0)):
+    """把图片按指定方式缩放到 frame_size，返回 RGB 图片。"""
+    if fit not in FIT_MODES:
+        raise ValueError(f"未知的填充方式: {fit}")
+    img = img.convert('RGB')
+    width, height = frame_size
+    if fit == FIT_STRETCH:
+        return img.resize(frame_size, Image.LANCZOS)
+
+    scale_w = width / img.width
+    scale_h = height / img.height
+    scale = max(scale_w, scale_h) if fit == FIT_COVER else min(scale_w, scale_h)
+    new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    scaled = img.resize(new_size, Image.LANCZOS)
+
+    if fit == FIT_COVER:
+        left = (new_size[0] - width) // 2
+        top = (new_size[1] - height) // 2
+        return scaled.crop((left, top, left + width, top + height))
+
+    canvas = Image.new('RGB', frame_size, color=fill)
+    canvas.paste(scaled, ((width - new_size[0]) // 2, (height - new_size[1]) // 2))
+    return canvas
+
+
+def fit_frame(frame, frame_size, fit=FIT_STRETCH, fill=(0, 0, 0)):
+    """与 fit_image 相同，但直接处理 OpenCV 的 BGR 帧。"""
+    # OpenCV 只在用到视频背景时才导入，纯色/图片背景的渲染不需要它
+    import cv2
+    if fit not in FIT_MODES:
+        raise ValueError(f"未知的填充方式: {fit}")
+    width, height = frame_size
+    src_h, src_w = frame.shape[:2]
+    if fit == FIT_STRETCH:
+        return cv2.resize(frame, frame_size)
+
+    scale_w = width / src_w
+    scale_h = height / src_h
+    scale = max(scale_w, scale_h) if fit == FIT_COVER else min(scale_w, scale_h)
+    new_w, new_h = max(1, round(src_w * scale)), max(1, round(src_h * scale))
+    scaled = cv2.resize(frame, (new_w, new_h))
+
+    if fit == FIT_COVER:
+        left = (new_w - width) // 2
+        top = (new_h - height) // 2
+        return np.ascontiguousarray(scaled[top:top + height, left:left + width])
+
+    canvas = np.empty((height, width, 3), dtype=np.uint8)
+    canvas[:] = fill[::-1]
+    left = (width - new_w) // 2
+    top = (height - new_h) // 2
+    canvas[top:top + new_h, left:left + new_w] = scaled
+    return canvas
+
+
+class PreparedBackground:
+    """解码、缩放一次后可反复使用的静态背景。
+
+    rgb / bgr 为只读的连续缓冲区，每个名字的帧从它们复制一份开始绘制。
+    """
+
+    def __init__(self, rgb):
+        self.rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+        self.bgr = np.ascontiguousarray(self.rgb[..., ::-1])
+        self.rgb.setflags(write=False)
+        self.bgr.setflags(write=False)
+        self._image = Image.fromarray(self.rgb)
+
+    @property
+    def frame_size(self):
+        return self.rgb.shape[1], self.rgb.shape[0]
+
+    @classmethod
+    def from_color(cls, color, frame_size):
+        return cls(np.asarray(Image.new('RGB', frame_size, color=color)))
+
+    @classmethod
+    def from_image(cls, path, frame_size, fit=FIT_STRETCH):
+        with Image.open(path) as img:
+            return cls(np.asarray(fit_image(img, frame_size, fit)))
+
+    def new_image(self):
+        # PIL 的 copy 只是一次内存拷贝，不会重新解码或重采样
+        return self._image.copy()
+
+
+class VideoBackgroundSource:
+    """循环播放的视频背景：整次渲染只打开一次文件并顺序解码。
+
+    后台预读线程把缩放好的 BGR 帧放进有界队列，渲染线程调用 read() 依次取帧，
+    播放到结尾后从头循环。random_start 为 True 时只在打开时随机跳转一次，
+    并且只跳到 keyframe_interval 的整数倍位置（通常就是关键帧），
+    避免在长 GOP 的 H.264 中从上一个关键帧开始整段解码。
+    start_offset 在起始位置的基础上再向后偏移若干帧（分段渲染时用于衔接前一段）。
+    """
+
+    def __init__(self, path, frame_size, fit=FIT_STRETCH, random_start=False,
+                 keyframe_interval=None, prefetch=16, rng=None, start_offset=0):
+        self.path = path
+        self.frame_size = frame_size
+        self.fit = fit
+        self.random_start = random_start
+        self.keyframe_interval = keyframe_interval
+        self.start_offset = start_offset
+        self._rng = rng or random.Random()
+        self._queue = queue.Queue(maxsize=max(1, prefetch))
+        self._stop = threading.Event()
+        self._thread = None
+        self._cap = None
+        # frame_size 为 None 时输出原始尺寸的帧，由使用方按各自的分辨率缩放
+        width, height = frame_size or (16, 16)
+        self._black = np.zeros((height, width, 3), dtype=np.uint8)
+        self.start_frame = 0
+        self._base_frame = 0
+        self._frame_count = 0
+
+    def open(self):
+        import cv2
+        if self._thread is not None:
+            return self
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            print(f"加载视频失败: {self.path}", file=sys.stderr)
+        else:
+            frame_count = self._frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            start = self._base_frame = self._pick_start_frame(frame_count) if self.random_start else 0
+            if frame_count > 0:
+                start = (start + self.start_offset) % frame_count
+            self.start_frame = start
+            if start:
+                self._cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        self._thread = threading.Thread(target=self._decode_loop, name='bg-video-prefetch', daemon=True)
+        self._thread.start()
+        return self
+
+    def _pick_start_frame(self, frame_count):
+        import cv2
+        if frame_count <= 1:
+            return 0
+        step = self.keyframe_interval
+        if not step:
+            # 未指定时按常见编码设置估计：每秒一个关键帧
+            step = max(1, round(self._cap.get(cv2.CAP_PROP_FPS) or 1))
+        return self._rng.randrange(0, frame_count, step)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode_loop(self):
+        import cv2
+        try:
+            if not self._cap.isOpened():
+                # 视频无法打开时与旧版一致，退化为黑色背景
+                while self._put(self._black):
+                    pass
+                return
+            decoded_any = False
+            rewound = False
+            while not self._stop.is_set():
+                ret, frame = self._cap.read()
+                if not ret:
+                    if not decoded_any and self.start_frame == 0:
+                        print(f"视频没有可读取的帧: {self.path}", file=sys.stderr)
+                        while self._put(self._black):
+                            pass
+                        return
+                    if rewound:
+                        # 刚回到开头就读不出帧（文件损坏、无法定位），继续循环只会空转
+                        raise RuntimeError(f"视频回到开头后无法继续读取: {self.path}")
+                    # 播放到结尾，回到第一帧继续循环
+                    self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    self.start_frame = 0
+                    rewound = True
+                    continue
+                decoded_any = True
+                rewound = False
+                if self.frame_size is not None:
+                    frame = fit_frame(frame, self.frame_size, self.fit)
+                if not self._put(frame):
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def read(self):
+        """返回下一帧缩放好的 BGR 背景（只读，使用方需要自行复制）。"""
+        if self._thread is None:
+            self.open()
+        item = self._queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def seek(self, frame_index):
+        """重新定位，使下一次 read() 返回从打开时起顺序读取的第 frame_index 帧（含循环）。"""
+        import cv2
+        if self._thread is None:
+            self.open()
+        self._stop.set()
+        self._thread.join()
+        self._stop = threading.Event()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._cap.isOpened() and self._frame_count > 0:
+            start = (self._base_frame + self.start_offset + frame_index) % self._frame_count
+            self.start_frame = start
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        self._thread = threading.Thread(target=self._decode_loop, name='bg-video-prefetch', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,198 @@
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10 及更早版本
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from .constants import BG_ALIASES, BG_SOLID
+from .engine import NameVideoRenderer, RenderConfig
+from .names import STDIN_PATH
+from .parallel import resolve_workers
+from .resources import SharedResources
+from .targets import OutputTarget
+from .writers import STREAM_STDOUT, WRITER_SHM
+
+# 清单中相对于清单文件所在目录解析的路径字段
+_PATH_FIELDS = ('name_file_path', 'font_path', 'output_path', 'cache_dir')
+
+# 每个子进程的共享资源（由 _init_worker 创建，同一进程中的任务共用）
+_worker_resources = None
+
+
+def load_manifest(path):
+    """读取 JSON 或 TOML 格式的批量任务清单，返回 [(任务名, RenderConfig), ...]。
+
+    清单包含可选的 defaults 表和 jobs 列表，每个任务的字段与 RenderConfig 相同，
+    frame_size 写成 [宽, 高]，相对路径按清单文件所在目录解析（'-' 表示标准输入/输出，保持不变）。
+    """
+    if path.lower().endswith('.toml'):
+        if tomllib is None:
+            raise RuntimeError("读取 TOML 清单需要 Python 3.11 或安装 tomli")
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    defaults = data.get('defaults', {})
+    known = {f.name for f in dataclasses.fields(RenderConfig)}
+    jobs = []
+    for i, job in enumerate(data.get('jobs', [])):
+        fields = dict(defaults, **job)
+        label = fields.pop('name', None)
+        unknown = set(fields) - known
+        if unknown:
+            raise ValueError(f"第 {i + 1} 个任务包含未知字段：{', '.join(sorted(unknown))}")
+        if 'frame_size' in fields:
+            fields['frame_size'] = tuple(fields['frame_size'])
+        bg_type = fields.get('bg_type', BG_SOLID)
+        fields['bg_type'] = BG_ALIASES.get(bg_type, bg_type)
+        for key in _PATH_FIELDS:
+            if fields.get(key) and fields[key] != STDIN_PATH:
+                fields[key] = os.path.join(base_dir, fields[key])
+        if fields['bg_type'] != BG_SOLID and fields.get('bg_value'):
+            fields['bg_value'] = os.path.join(base_dir, fields['bg_value'])
+        if fields.get('targets'):
+            fields['targets'] = tuple(
+                OutputTarget(**dict(t, output_path=os.path.join(base_dir, t['output_path'])))
+                for t in fields['targets'])
+        try:
+            config = RenderConfig(**fields)
+        except TypeError as e:
+            raise ValueError(f"第 {i + 1} 个任务缺少必要字段：{e}") from e
+        jobs.append((label or os.path.basename(config.output_path), config))
+    if not jobs:
+        raise ValueError("清单中没有任务")
+    return jobs
+
+
+def _job_order(job):
+    # 相同字体、字号和背景的任务排在一起，尽量落在同一个进程中复用资源
+    _, config = job[1]
+    return (config.font_path, config.text_size, config.bg_type, config.bg_value, config.frame_size)
+
+
+def _init_worker():
+    global _worker_resources
+    _worker_resources = SharedResources()
+
+
+def _writes_file(config):
+    # 写到标准输出或共享内存的任务没有输出文件
+    return config.writer != WRITER_SHM and config.output_path != STREAM_STDOUT
+
+
+def run_job(label, config, resources=None):
+    """运行单个任务并返回结果记录；失败不抛出异常，错误写在记录的 error 中。
+
+    输出到标准输出或共享内存时没有文件大小，记录中的 bytes 为 None。
+    """
+    if resources is None:
+        resources = _worker_resources
+    start = time.perf_counter()
+    record = {'name': label, 'output': config.output_path, 'frames': 0, 'bytes': 0, 'error': None}
+    try:
+        for target in (config,) + tuple(config.targets):
+            os.makedirs(os.path.dirname(os.path.abspath(target.output_path)), exist_ok=True)
+        record['frames'] = NameVideoRenderer(config, resources=resources).render()
+        if _writes_file(config):
+            record['bytes'] = sum(os.path.getsize(target.output_path)
+                                  for target in (config,) + tuple(config.targets))
+        else:
+            record['bytes'] = None
+    except Exception as e:
+        record['error'] = str(e) or type(e).__name__
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+
+def run_batch(jobs, workers=1, on_result=None):
+    """在进程池中运行批量任务，按清单顺序返回结果记录；on_result(记录) 在每个任务完成时调用。
+
+    同一进程内的任务共用已加载的字体、静态背景和文字/字形缓存。
+    workers 为 1 时在当前进程中依次运行，0 表示使用全部 CPU 核心。
+    """
+    workers = min(resolve_workers(workers), len(jobs))
+    ordered = sorted(enumerate(jobs), key=_job_order)
+    results = [None] * len(jobs)
+    if workers <= 1:
+        resources = SharedResources()
+        for index, (label, config) in ordered:
+            results[index] = run_job(label, config, resources)
+            if on_result is not None:
+                on_result(results[index])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(run_job, label, config): index for index, (label, config) in ordered}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if on_result is not None:
+                on_result(results[futures[future]])
+    return results
+
+
+def format_report(results):
+    lines = [f"{'任务':<24}{'耗时(秒)':>10}{'帧数':>10}{'大小(KB)':>12}  结果"]
+    for r in results:
+        status = '成功' if r['error'] is None else f"失败：{r['error']}"
+        size = '-' if r['bytes'] is None else f"{r['bytes'] / 1024:.1f}"
+        lines.append(f"{r['name']:<24}{r['seconds']:>10.2f}{r['frames']:>10}{size:>12}  {status}")
+    total_seconds = sum(r['seconds'] for r in results)
+    total_frames = sum(r['frames'] for r in results)
+    failed = sum(r['error'] is not None for r in results)
+    lines.append(f"共 {len(results)} 个任务，失败 {failed} 个，累计耗时 {total_seconds:.2f} 秒，共 {total_frames} 帧")
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m name_flash batch',
+        description='按清单批量生成名字闪烁视频')
+    parser.add_argument('manifest', help='任务清单（.json 或 .toml）')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='同时运行的任务数，1 为依次运行，0 为全部 CPU 核心')
+    parser.add_argument('--report', default=None, help='把汇总报告另存为 JSON 文件')
+    parser.add_argument('--quiet', action='store_true', help='不输出每个任务的完成情况')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        jobs = load_manifest(args.manifest)
+    except Exception as e:
+        print(f"读取清单失败：{e}", file=sys.stderr)
+        return 1
+
+    done = []
+
+    def report(record):
+        done.append(record)
+        if not args.quiet:
+            status = '完成' if record['error'] is None else f"失败：{record['error']}"
+            print(f"[{len(done)}/{len(jobs)}] {record['name']} {status}（{record['seconds']:.2f} 秒）",
+                  file=sys.stderr)
+
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=args.workers, on_result=report)
+    wall = time.perf_counter() - start
+    # 有任务把原始帧写到标准输出时，汇总报告改写到标准错误，不混进帧流
+    out = sys.stderr if any(config.output_path == STREAM_STDOUT for _, config in jobs) else sys.stdout
+    print(format_report(results), file=out)
+    print(f"总用时 {wall:.2f} 秒", file=out)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'wall_seconds': wall, 'jobs': results}, f, ensure_ascii=False, indent=2)
+    return 1 if any(r['error'] is not None for r in results) else 0
@@ -0,0 +1,163 @@
+import dataclasses
+import hashlib
+import json
+import os
+
+from .checkpoint import RUNTIME_FIELDS
+
+# 渲染缓存的默认磁盘上限
+DEFAULT_RENDER_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+# 每个分块的平均名字数（分块边界由名字内容决定，最长不超过平均值的 4 倍）
+DEFAULT_CACHE_BLOCK_NAMES = 64
+
+# 同一进程内已计算过的文件摘要：(路径, 大小, 修改时间) -> sha256
+_file_digests = {}
+
+
+def file_digest(path):
+    """文件内容的 sha256；文件大小和修改时间不变时直接返回上次的结果。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _file_digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = _file_digests[key] = h.hexdigest()
+    return digest
+
+
+def render_fingerprint(config, seed=None, video=False):
+    """影响画面和编码结果的全部参数的摘要，字体和背景文件按内容计算，与路径无关。
+
+    静态背景时视频相关的参数不影响输出，随机种子也只在文字抖动时才参与计算。
+    """
+    fields = {k: v for k, v in dataclasses.asdict(config).items()
+              if k not in RUNTIME_FIELDS and k != 'name_file_path'}
+    fields['font_path'] = file_digest(config.font_path)
+    if video:
+        fields['seed'] = seed
+    else:
+        for k in ('seed', 'bg_random_start', 'bg_keyframe_interval', 'bg_start_offset'):
+            fields.pop(k, None)
+        if config.jitter:
+            fields['seed'] = config.seed
+    if os.path.isfile(config.bg_value):
+        fields['bg_value'] = file_digest(config.bg_value)
+    fields['container'] = os.path.splitext(config.output_path)[1].lower() or '.mp4'
+    data = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _is_boundary(name, block_names):
+    h = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(h, 'little') % block_names == 0
+
+
+def iter_blocks(names, block_names=DEFAULT_CACHE_BLOCK_NAMES):
+    """把名字切成分块，边界由名字本身的哈希决定（内容定义分块）。
+
+    在名单中间插入或删除名字只会改变它所在的分块，后面的分块保持不变，仍可命中缓存。
+    """
+    block_names = max(1, block_names)
+    block = []
+    for name in names:
+        block.append(name)
+        if _is_boundary(name, block_names) or len(block) >= block_names * 4:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+class RenderCache:
+    """按内容寻址的磁盘缓存，保存已编码好的视频分块。
+
+    分块的键是 (渲染参数摘要, 分块中的名字, 视频背景的起始帧) 的哈希，
+    命中时更新文件的修改时间，超出磁盘上限时按修改时间从旧到新淘汰（LRU）。
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_RENDER_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hit_frames = 0
+        self.encoded_frames = 0
+
+    @staticmethod
+    def block_key(fingerprint, names, start_frame=None):
+        h = hashlib.sha256(fingerprint.encode('ascii'))
+        h.update(f'\0{start_frame}\0'.encode('ascii'))
+        for name in names:
+            h.update(name.encode('utf-8'))
+            h.update(b'\n')
+        return h.hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def lookup(self, key, ext):
+        """返回缓存的分块路径，未命中时返回 None。"""
+        path = self._path(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def partial_path(self, key, ext):
+        # 临时文件保留原扩展名，编码后端据此选择封装格式
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return os.path.join(os.path.dirname(path), f'{key}.partial-{os.getpid()}{ext}')
+
+    def commit(self, partial, key, ext):
+        path = self._path(key, ext)
+        os.replace(partial, path)
+        return path
+
+    def evict(self, keep=()):
+        """淘汰最久未使用的分块，直到总大小不超过上限；keep 中的键本次不淘汰。"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if '.partial-' in filename:
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                total += st.st_size
+                entries.append((st.st_mtime_ns, st.st_size, path, os.path.splitext(filename)[0]))
+        entries.sort()
+        for _, size, path, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        return total
+
+    def stats(self):
+        blocks = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_frames': self.hit_frames,
+            'encoded_frames': self.encoded_frames,
+            'hit_rate': self.hits / blocks if blocks else 0.0,
+        }
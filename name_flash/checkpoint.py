@@ -0,0 +1,124 @@
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+
+MANIFEST_VERSION = 1
+
+# 不影响输出画面的配置项，不参与配置哈希（修改它们后仍然可以续传）
+RUNTIME_FIELDS = {
+    'output_path', 'progress_interval', 'ffmpeg_path', 'workers', 'max_in_flight', 'batch_size',
+    'segments', 'text_cache_bytes', 'glyph_atlas', 'bg_prefetch', 'checkpoint_names', 'resume',
+    'effect_batch', 'stream_slots', 'cache_dir', 'cache_bytes', 'cache_block_names', 'targets',
+    'timing', 'timing_report', 'profile_path', 'trace_memory',
+}
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def config_hash(config):
+    """对影响输出的配置（以及字体、背景文件的大小和修改时间）计算哈希。"""
+    fields = {k: v for k, v in dataclasses.asdict(config).items() if k not in RUNTIME_FIELDS}
+    fields['font_file'] = _file_signature(config.font_path)
+    fields['bg_file'] = _file_signature(config.bg_value)
+    data = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class CheckpointManifest:
+    """分块渲染的检查点：记录配置哈希、已完成的名字数量和已完成的分块文件。
+
+    清单保存在 <输出文件>.checkpoint.json，分块保存在 <输出文件>.chunks/ 目录下，
+    每写完一个分块就以原子替换的方式更新清单，进程崩溃或被取消后可以从最后一个完整分块继续。
+    """
+
+    def __init__(self, config, data):
+        self.config = config
+        self.data = data
+
+    @staticmethod
+    def manifest_path(config):
+        return config.output_path + '.checkpoint.json'
+
+    @staticmethod
+    def chunk_dir(config):
+        return config.output_path + '.chunks'
+
+    @classmethod
+    def open(cls, config, resume=False):
+        """resume 为 True 时读取已有清单（配置必须一致），否则重新开始。"""
+        path = cls.manifest_path(config)
+        digest = config_hash(config)
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION or data.get('config_hash') != digest:
+                raise ValueError("渲染配置与检查点不一致，无法续传；请去掉 --resume 重新渲染")
+            return cls(config, data)
+
+        shutil.rmtree(cls.chunk_dir(config), ignore_errors=True)
+        from .background import resolve_seed
+        # 续传时必须复现同一个随机起点，所以把随机种子记录下来
+        seed = resolve_seed(config.seed)
+        data = {
+            'version': MANIFEST_VERSION,
+            'config_hash': digest,
+            'seed': seed,
+            'completed_names': 0,
+            'names_digest': hashlib.sha256().hexdigest(),
+            'chunks': [],
+        }
+        manifest = cls(config, data)
+        manifest.save()
+        return manifest
+
+    @property
+    def seed(self):
+        return self.data['seed']
+
+    @property
+    def completed_names(self):
+        return self.data['completed_names']
+
+    @property
+    def chunks(self):
+        return [os.path.join(self.chunk_dir(self.config), name) for name in self.data['chunks']]
+
+    def next_chunk_path(self):
+        os.makedirs(self.chunk_dir(self.config), exist_ok=True)
+        ext = os.path.splitext(self.config.output_path)[1] or '.mp4'
+        return os.path.join(self.chunk_dir(self.config), f"chunk_{len(self.data['chunks']):06d}{ext}")
+
+    def add_chunk(self, path, names_count, names_digest):
+        self.data['chunks'].append(os.path.basename(path))
+        self.data['completed_names'] += names_count
+        self.data['names_digest'] = names_digest
+        self.save()
+
+    def save(self):
+        path = self.manifest_path(self.config)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def remove(self):
+        shutil.rmtree(self.chunk_dir(self.config), ignore_errors=True)
+        try:
+            os.remove(self.manifest_path(self.config))
+        except FileNotFoundError:
+            pass
+
+
+def names_digest_update(digest, name):
+    digest.update(name.encode('utf-8'))
+    digest.update(b'\n')
@@ -0,0 +1,195 @@
+import argparse
+import sys
+
+# 这里只导入轻量的模块，--help 和参数检查不需要加载 numpy、PIL、OpenCV；渲染引擎在 main 中才导入
+from .cache import DEFAULT_CACHE_BLOCK_NAMES, DEFAULT_RENDER_CACHE_BYTES
+from .constants import (BG_ALIASES, BG_SOLID, BG_TYPES, DEFAULT_EFFECT_BATCH, DEFAULT_FIT_MARGIN,
+                        DEFAULT_MIN_TEXT_SIZE, DEFAULT_TEXT_CACHE_BYTES, FIT_MODES, FIT_STRETCH)
+from .progress import format_seconds
+from .targets import parse_target
+from .timing import format_stages
+from .writers import (CODEC_H264, CODECS, DEFAULT_CRF, DEFAULT_PRESET, DEFAULT_STREAM_SLOTS, PIX_BGR24,
+                      PIXEL_FORMATS, WRITER_AUTO, WRITERS)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m name_flash',
+        description='名字闪烁视频生成器（命令行/无界面版本）')
+    parser.add_argument('--names', required=True, help="姓名文件位置（txt，每行一个名字），'-' 表示从标准输入读取，也可以是命名管道")
+    parser.add_argument('--font', required=True, help='字体文件位置（ttf/otf）')
+    parser.add_argument('--output', required=True,
+                        help="视频输出路径；--writer raw 时 '-' 表示标准输出，--writer shm 时为共享内存的名字")
+    parser.add_argument('--fps', type=int, default=30, help='帧率（默认 30）')
+    parser.add_argument('--width', type=int, default=192, help='分辨率宽度（默认 192）')
+    parser.add_argument('--height', type=int, default=108, help='分辨率高度（默认 108）')
+    parser.add_argument('--interval', type=float, default=0.2, help='名字停留时间，秒（默认 0.2）')
+    parser.add_argument('--text-size', type=int, default=70, help='文字大小（默认 70）')
+    parser.add_argument('--auto-fit', action='store_true',
+                        help='自动字号：名字过长时缩小到能完整显示，--text-size 作为最大字号')
+    parser.add_argument('--fit-margin', type=float, default=DEFAULT_FIT_MARGIN,
+                        help='自动字号时画面四周保留的边距比例（默认 0.05）')
+    parser.add_argument('--min-text-size', type=int, default=DEFAULT_MIN_TEXT_SIZE,
+                        help='自动字号允许的最小字号（默认 10）')
+    parser.add_argument('--text-color', default='#ffffff', help='文字颜色（默认 #ffffff）')
+    parser.add_argument('--fade-frames', type=int, default=0, help='每个名字开头淡入、结尾淡出的帧数（默认 0）')
+    parser.add_argument('--zoom', type=float, default=0.0,
+                        help='名字停留期间逐渐放大的比例，例如 0.1 表示放大到 1.1 倍（默认 0）')
+    parser.add_argument('--jitter', type=int, default=0,
+                        help='文字位置每帧随机抖动的最大像素数（默认 0），配合 --seed 可复现')
+    parser.add_argument('--effect-batch', type=int, default=DEFAULT_EFFECT_BATCH,
+                        help='逐帧特效每批合成的帧数（默认 8）')
+    parser.add_argument('--bg-type', default=BG_SOLID,
+                        choices=list(BG_TYPES) + list(BG_ALIASES),
+                        help='背景类型：纯色/图片/视频（循环播放），或 solid/image/video')
+    parser.add_argument('--bg-value', default='#000000', help='背景值：颜色或图片/视频路径')
+    parser.add_argument('--bg-fit', default=FIT_STRETCH, choices=FIT_MODES,
+                        help='图片背景填充方式：stretch 拉伸 / cover 裁剪铺满 / contain 完整显示')
+    parser.add_argument('--bg-random-start', action='store_true',
+                        help='视频背景随机选择起始位置（只跳到关键帧附近）')
+    parser.add_argument('--bg-keyframe-interval', type=int, default=0,
+                        help='视频背景的关键帧间隔（帧），0 表示按帧率估计')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子，固定后输出可复现')
+    parser.add_argument('--text-cache-mb', type=float, default=DEFAULT_TEXT_CACHE_BYTES / 1024 / 1024,
+                        help='文字图层缓存的内存上限（MB，默认 64）')
+    parser.add_argument('--no-glyph-atlas', action='store_true',
+                        help='不使用字形图集，每个名字都交给 FreeType 整体渲染')
+    parser.add_argument('--writer', default=WRITER_AUTO, choices=WRITERS,
+                        help='输出后端：auto（有 ffmpeg 时用 ffmpeg）/ opencv / ffmpeg，'
+                             '或不编码直接输出原始帧：raw（标准输出/命名管道/文件）/ shm（共享内存环形缓冲区）')
+    parser.add_argument('--pixel-format', default=PIX_BGR24, choices=PIXEL_FORMATS,
+                        help='原始帧的像素格式：bgr24 合成好的画面 / rgba 只输出文字、背景透明（默认 bgr24）')
+    parser.add_argument('--stream-slots', type=int, default=DEFAULT_STREAM_SLOTS,
+                        help='共享内存环形缓冲区的帧槽数，读取端落后这么多帧时渲染暂停等待（默认 8）')
+    parser.add_argument('--codec', default=CODEC_H264, choices=CODECS, help='ffmpeg 编码器（默认 libx264）')
+    parser.add_argument('--crf', type=int, default=DEFAULT_CRF, help='ffmpeg 恒定质量参数（默认 23）')
+    parser.add_argument('--preset', default=DEFAULT_PRESET, help='ffmpeg 编码速度预设（默认 medium）')
+    parser.add_argument('--hold-frames', action='store_true',
+                        help='静态背景时每个名字只编码一帧，用时间戳保持显示时长（仅 ffmpeg）')
+    parser.add_argument('--ffmpeg', default='ffmpeg', help='ffmpeg 可执行文件路径')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='渲染进程数，1 为单进程，0 为全部 CPU 核心（视频背景始终单进程）')
+    parser.add_argument('--max-in-flight', type=int, default=0,
+                        help='同时在途的渲染批次上限，0 表示进程数的两倍')
+    parser.add_argument('--batch-size', type=int, default=8, help='每个渲染任务包含的名字数')
+    parser.add_argument('--segments', type=int, default=1,
+                        help='分段并行编码的段数，1 为不分段，0 为 CPU 核心数（需要 ffmpeg 无损拼接）')
+    parser.add_argument('--checkpoint-names', type=int, default=0,
+                        help='每 N 个名字写成一个完整分块并记录检查点，中断后可续传（需要 ffmpeg），0 为不启用')
+    parser.add_argument('--resume', action='store_true', help='从上次中断的检查点继续渲染')
+    parser.add_argument('--cache-dir', default=None,
+                        help='渲染缓存目录：已编码的分块按内容保存，重新渲染时只编码变化的部分（需要 ffmpeg）')
+    parser.add_argument('--cache-mb', type=float, default=DEFAULT_RENDER_CACHE_BYTES / 1024 / 1024,
+                        help='渲染缓存的磁盘上限（MB，默认 2048），超出后淘汰最久未使用的分块')
+    parser.add_argument('--cache-block-names', type=int, default=DEFAULT_CACHE_BLOCK_NAMES,
+                        help='渲染缓存每个分块的平均名字数（默认 64）')
+    parser.add_argument('--target', action='append', default=[], metavar='宽x高[@帧率][:编码器]=路径',
+                        help='同一次渲染的额外输出，可重复使用，例如 --target 1080x1920@30=竖屏.mp4')
+    parser.add_argument('--timing', action='store_true', help='统计各阶段耗时，结束后输出汇总表')
+    parser.add_argument('--timing-report', default=None,
+                        help='把阶段耗时、缓存命中率等统计写入这个 JSON 文件（同时开启 --timing）')
+    parser.add_argument('--profile', default=None, help='用 cProfile 记录整个渲染过程，结果保存到这个文件')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='用 tracemalloc 记录内存分配（较慢），结果写入统计报告')
+    parser.add_argument('--quiet', action='store_true', help='不输出进度')
+    return parser
+
+
+def config_from_args(args):
+    from .engine import RenderConfig
+    return RenderConfig(
+        name_file_path=args.names,
+        font_path=args.font,
+        output_path=args.output,
+        fps=args.fps,
+        frame_size=(args.width, args.height),
+        interval=args.interval,
+        text_size=args.text_size,
+        text_color=args.text_color,
+        auto_fit=args.auto_fit,
+        fit_margin=args.fit_margin,
+        min_text_size=args.min_text_size,
+        fade_frames=args.fade_frames,
+        zoom=args.zoom,
+        jitter=args.jitter,
+        effect_batch=args.effect_batch,
+        bg_type=BG_ALIASES.get(args.bg_type, args.bg_type),
+        bg_value=args.bg_value,
+        bg_fit=args.bg_fit,
+        bg_random_start=args.bg_random_start,
+        bg_keyframe_interval=args.bg_keyframe_interval,
+        seed=args.seed,
+        text_cache_bytes=int(args.text_cache_mb * 1024 * 1024),
+        glyph_atlas=not args.no_glyph_atlas,
+        writer=args.writer,
+        codec=args.codec,
+        crf=args.crf,
+        preset=args.preset,
+        hold_frames=args.hold_frames,
+        ffmpeg_path=args.ffmpeg,
+        pixel_format=args.pixel_format,
+        stream_slots=args.stream_slots,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        batch_size=args.batch_size,
+        segments=args.segments,
+        checkpoint_names=args.checkpoint_names,
+        resume=args.resume,
+        cache_dir=args.cache_dir,
+        cache_bytes=int(args.cache_mb * 1024 * 1024),
+        cache_block_names=args.cache_block_names,
+        targets=tuple(parse_target(spec) for spec in args.target),
+        timing=args.timing,
+        timing_report=args.timing_report,
+        profile_path=args.profile,
+        trace_memory=args.trace_memory,
+    )
+
+
+def print_progress(event):
+    # 从管道读取名单时无法估计总数，只显示已完成的帧数
+    total = event.total_frames or '?'
+    sys.stderr.write(f"\r进度: {event.current_frame}/{total} 帧 ({event.percent:.1f}%) "
+                     f"{event.frames_per_sec:.0f} 帧/秒 剩余 {format_seconds(event.eta_seconds)}")
+    if event.finished:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == 'batch':
+        # python -m name_flash batch 清单文件：按清单批量渲染
+        from .batch import main as batch_main
+        return batch_main(argv[1:])
+    args = build_parser().parse_args(argv)
+    from .engine import NameVideoRenderer
+    callback = None if args.quiet else print_progress
+    try:
+        renderer = NameVideoRenderer(config_from_args(args), progress_callback=callback)
+        renderer.render()
+    except KeyboardInterrupt:
+        print("\n已取消" + ("，可使用 --resume 从检查点继续" if args.checkpoint_names else ""), file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"视频生成失败：{e}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        stats = renderer.text_cache.stats()
+        if stats['hits'] or stats['misses']:
+            print(f"文字缓存：命中 {stats['hits']} 次，未命中 {stats['misses']} 次"
+                  f"（命中率 {stats['hit_rate'] * 100:.1f}%），"
+                  f"光栅化字形 {stats['glyphs_rasterized']} 个", file=sys.stderr)
+        if renderer.render_cache is not None:
+            stats = renderer.render_cache.stats()
+            print(f"渲染缓存：复用 {stats['hits']} 个分块（{stats['hit_frames']} 帧），"
+                  f"重新编码 {stats['misses']} 个分块（{stats['encoded_frames']} 帧），"
+                  f"淘汰 {stats['evictions']} 个", file=sys.stderr)
+        if renderer.timer.enabled:
+            print(format_stages(renderer.timer.summary()), file=sys.stderr)
+        if renderer.memory is not None:
+            print(f"内存峰值（tracemalloc）：{renderer.memory['peak_bytes'] / 1024 / 1024:.1f} MB", file=sys.stderr)
+        for output in [args.output] + [parse_target(spec).output_path for spec in args.target]:
+            print(f"视频生成成功：{output}", file=sys.stderr)
+    return 0
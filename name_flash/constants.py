@@ -0,0 +1,25 @@
+"""界面和命令行共用的常量。这个模块不导入 numpy、PIL、OpenCV，界面启动时可以直接使用。"""
+
+# 背景类型（与 GUI 下拉框保持一致）
+BG_SOLID = '纯色'
+BG_IMAGE = '图片'
+BG_VIDEO = '视频（循环播放）'
+BG_TYPES = (BG_SOLID, BG_IMAGE, BG_VIDEO)
+# 命令行和任务清单中允许使用英文别名代替中文背景类型
+BG_ALIASES = {'solid': BG_SOLID, 'image': BG_IMAGE, 'video': BG_VIDEO}
+
+# 图片背景的填充方式
+FIT_STRETCH = 'stretch'   # 直接拉伸到帧大小（旧版行为）
+FIT_COVER = 'cover'       # 按比例放大并居中裁剪，铺满整个帧
+FIT_CONTAIN = 'contain'   # 按比例缩放完整显示，空白处填充底色
+FIT_MODES = (FIT_STRETCH, FIT_COVER, FIT_CONTAIN)
+
+# 文字图层缓存的默认内存上限
+DEFAULT_TEXT_CACHE_BYTES = 64 * 1024 * 1024
+
+# 自动字号时画面四周保留的边距（占宽、高的比例）和允许的最小字号
+DEFAULT_FIT_MARGIN = 0.05
+DEFAULT_MIN_TEXT_SIZE = 10
+
+# 逐帧特效每批最多同时合成的帧数
+DEFAULT_EFFECT_BATCH = 8
@@ -0,0 +1,675 @@
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from PIL import ImageFont
+
+from .autosize import FontPool, TextFitter
+from .background import FIT_MODES, FIT_STRETCH, PreparedBackground, VideoBackgroundSource, resolve_seed
+from .cache import (DEFAULT_CACHE_BLOCK_NAMES, DEFAULT_RENDER_CACHE_BYTES, RenderCache, iter_blocks,
+                    render_fingerprint)
+from .checkpoint import CheckpointManifest, names_digest_update
+from .constants import BG_IMAGE, BG_SOLID, BG_TYPES, BG_VIDEO, DEFAULT_FIT_MARGIN, DEFAULT_MIN_TEXT_SIZE
+from .effects import DEFAULT_EFFECT_BATCH, EffectRenderer, name_rng, plan_effects
+from .frame import FrameBuffer
+from .names import NameSource
+from .progress import DEFAULT_PROGRESS_INTERVAL, ProgressChannel
+from .targets import render_targets
+from .text import DEFAULT_TEXT_CACHE_BYTES, TextLayerCache
+from .timing import NULL_TIMER, StageTimer
+from .writers import (CODEC_H264, CODECS, DEFAULT_CRF, DEFAULT_PRESET, DEFAULT_STREAM_SLOTS, PIX_BGR24,
+                      PIX_RGBA, PIXEL_FORMATS, STREAM_WRITERS, WRITER_AUTO, WRITERS, create_writer,
+                      find_ffmpeg)
+
+
+@dataclass
+class RenderConfig:
+    """一次渲染任务的全部参数，不依赖任何界面对象。"""
+    name_file_path: str
+    font_path: str
+    output_path: str
+    fps: int = 30
+    frame_size: tuple = (192, 108)
+    interval: float = 0.2
+    text_size: int = 70
+    text_color: str = '#ffffff'
+    # 自动字号：名字过长时逐个缩小到能放进画面（四周留 fit_margin 比例的边距），text_size 为上限
+    auto_fit: bool = False
+    fit_margin: float = DEFAULT_FIT_MARGIN
+    min_text_size: int = DEFAULT_MIN_TEXT_SIZE
+    # 逐帧特效：每个名字开头淡入、结尾淡出 fade_frames 帧，停留期间放大到 1+zoom 倍，
+    # 文字位置每帧随机抖动不超过 jitter 像素（由 seed 和名字决定，可以重现）；全部为 0 时不启用
+    fade_frames: int = 0
+    zoom: float = 0.0
+    jitter: int = 0
+    effect_batch: int = DEFAULT_EFFECT_BATCH
+    bg_type: str = BG_SOLID
+    bg_value: str = '#000000'
+    bg_fit: str = FIT_STRETCH
+    # 视频背景：是否随机选择起始位置（只跳到关键帧附近），0 表示按视频帧率估计关键帧间隔
+    bg_random_start: bool = False
+    bg_keyframe_interval: int = 0
+    bg_prefetch: int = 16
+    # 视频背景起始位置的额外偏移（帧），分段渲染时由引擎自动设置
+    bg_start_offset: int = 0
+    seed: Optional[int] = None
+    text_cache_bytes: int = DEFAULT_TEXT_CACHE_BYTES
+    # 使用字形图集拼接文字（每个字符只光栅化一次）
+    glyph_atlas: bool = True
+    # 进度事件的最短间隔（秒）
+    progress_interval: float = DEFAULT_PROGRESS_INTERVAL
+    # 输出后端：auto / opencv / ffmpeg / raw / shm，codec、crf、preset 只对 ffmpeg 生效
+    writer: str = WRITER_AUTO
+    codec: str = CODEC_H264
+    crf: int = DEFAULT_CRF
+    preset: str = DEFAULT_PRESET
+    # 静态背景时每个名字只编码一帧，由时间戳保持显示时长
+    hold_frames: bool = False
+    ffmpeg_path: str = 'ffmpeg'
+    # 原始帧输出（raw/shm）：像素格式为 bgr24（合成好的画面）或 rgba（只有文字、背景透明），
+    # stream_slots 为共享内存环形缓冲区的帧槽数
+    pixel_format: str = PIX_BGR24
+    stream_slots: int = DEFAULT_STREAM_SLOTS
+    # 多进程渲染：workers 为 1 时在当前进程渲染，0 表示使用全部 CPU 核心
+    workers: int = 1
+    max_in_flight: int = 0
+    batch_size: int = 8
+    # 分段并行编码：segments 为 1 时不分段，0 表示按 CPU 核心数分段（需要 ffmpeg 拼接）
+    segments: int = 1
+    # 检查点续传：每 checkpoint_names 个名字写成一个完整分块并更新清单，0 表示不启用
+    checkpoint_names: int = 0
+    resume: bool = False
+    # 渲染缓存：已编码的分块按内容保存在 cache_dir 中，重新渲染时只编码变化的分块
+    cache_dir: Optional[str] = None
+    cache_bytes: int = DEFAULT_RENDER_CACHE_BYTES
+    cache_block_names: int = DEFAULT_CACHE_BLOCK_NAMES
+    # 同一次渲染的额外输出（OutputTarget 列表），共用名单读取、字体和背景解码
+    targets: tuple = ()
+    # 诊断：timing 统计各阶段耗时，timing_report 为报告的 JSON 路径（同时开启计时），
+    # profile_path 保存 cProfile 结果，trace_memory 用 tracemalloc 记录内存分配
+    timing: bool = False
+    timing_report: Optional[str] = None
+    profile_path: Optional[str] = None
+    trace_memory: bool = False
+
+    @property
+    def frames_per_name(self):
+        return int(self.interval * self.fps)
+
+    @property
+    def has_effects(self):
+        return bool(self.fade_frames or self.zoom or self.jitter)
+
+
+class NameVideoRenderer:
+    """无界面的名字闪烁视频渲染器，可在没有显示器的服务器上直接使用。
+
+    进度通过 ProgressChannel 汇报：progress_callback(event) 按 config.progress_interval 限频调用，
+    也可以传入自己的 progress 通道，由界面线程轮询 progress.snapshot()。
+    传入 resources（SharedResources）时，字体、静态背景和文字缓存从中获取，与其他任务共用。
+    """
+
+    def __init__(self, config, progress_callback=None, progress=None, resources=None):
+        if config.bg_type not in BG_TYPES:
+            raise ValueError(f"未知的背景类型: {config.bg_type}")
+        if config.bg_fit not in FIT_MODES:
+            raise ValueError(f"未知的填充方式: {config.bg_fit}")
+        if config.writer not in WRITERS:
+            raise ValueError(f"未知的输出后端: {config.writer}")
+        if config.codec not in CODECS:
+            raise ValueError(f"不支持的编码器: {config.codec}")
+        if config.pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"不支持的像素格式: {config.pixel_format}")
+        self.output_text_color = config.text_color
+        if config.pixel_format == PIX_RGBA:
+            if config.writer not in STREAM_WRITERS:
+                raise ValueError(f"只有原始帧输出（{'/'.join(STREAM_WRITERS)}）支持 {PIX_RGBA} 像素格式")
+            # 只输出文字：在黑色背景上渲染白色文字，得到的灰度就是 alpha，由输出后端填上文字颜色
+            config = replace(config, bg_type=BG_SOLID, bg_value='#000000', text_color='#ffffff')
+        self.config = config
+        if progress is None:
+            progress = ProgressChannel(progress_callback, min_interval=config.progress_interval)
+        self.progress = progress
+        self._background = None
+        self._frame_buffer = None
+        self.resources = resources
+        if resources is not None:
+            self.text_cache = resources.text_cache(config.glyph_atlas, config.text_cache_bytes)
+        else:
+            self.text_cache = TextLayerCache(config.text_cache_bytes, use_atlas=config.glyph_atlas)
+        self.render_cache = None
+        self.timer = StageTimer() if config.timing or config.timing_report else NULL_TIMER
+        if self.timer.enabled:
+            self.progress.timer = self.timer
+        self.elapsed = None
+        self.memory = None
+        self._fitter = None
+        self._effects = None
+
+    def open_names(self):
+        """惰性读取名单（文件、'-' 表示标准输入、命名管道），跳过空行。"""
+        return NameSource(self.config.name_file_path)
+
+    def load_names(self):
+        return list(self.open_names())
+
+    def load_font(self):
+        cfg = self.config
+        if self.resources is not None:
+            return self.resources.font(cfg.font_path, cfg.text_size)
+        if cfg.auto_fit:
+            return self.fitter.font_for_size(cfg.text_size)
+        return ImageFont.truetype(cfg.font_path, cfg.text_size)
+
+    @property
+    def fitter(self):
+        """自动字号使用的 TextFitter，各字号的字体来自共享资源或本渲染器的字体池。"""
+        if self._fitter is None:
+            cfg = self.config
+            if self.resources is not None:
+                def font_for_size(size):
+                    return self.resources.font(cfg.font_path, size)
+            else:
+                font_for_size = FontPool(cfg.font_path)
+            self._fitter = TextFitter(font_for_size, cfg.frame_size, cfg.text_size,
+                                      min_size=cfg.min_text_size, margin=cfg.fit_margin)
+        return self._fitter
+
+    def prepare_background(self):
+        """静态背景在整次渲染中只解码、缩放一次。"""
+        cfg = self.config
+        if cfg.bg_type == BG_SOLID:
+            return PreparedBackground.from_color(cfg.bg_value, cfg.frame_size)
+        if cfg.bg_type == BG_IMAGE:
+            try:
+                return PreparedBackground.from_image(cfg.bg_value, cfg.frame_size, cfg.bg_fit)
+            except Exception as e:
+                print(f"加载图片失败: {e}", file=sys.stderr)
+                return PreparedBackground.from_color((0, 0, 0), cfg.frame_size)
+        # 视频背景：静态场合（如单帧渲染）使用第一帧
+        with VideoBackgroundSource(cfg.bg_value, cfg.frame_size, fit=cfg.bg_fit, prefetch=1) as video:
+            return PreparedBackground(video.read()[..., ::-1])
+
+    def open_video_background(self, seed=None, skip_frames=0, scale=True):
+        """打开视频背景；seed 覆盖配置中的随机种子，skip_frames 为额外跳过的帧数（续传时使用）。
+
+        scale 为 False 时输出原始尺寸的帧，由调用方自行缩放（多输出时共用一路解码）。
+        """
+        cfg = self.config
+        return VideoBackgroundSource(
+            cfg.bg_value, cfg.frame_size if scale else None, fit=cfg.bg_fit,
+            random_start=cfg.bg_random_start,
+            keyframe_interval=cfg.bg_keyframe_interval or None,
+            prefetch=cfg.bg_prefetch,
+            rng=random.Random(cfg.seed if seed is None else seed),
+            start_offset=cfg.bg_start_offset + skip_frames,
+        ).open()
+
+    @property
+    def background(self):
+        if self._background is None:
+            if self.resources is not None:
+                self._background = self.resources.background(self)
+            else:
+                self._background = self.prepare_background()
+        return self._background
+
+    @property
+    def frame_buffer(self):
+        if self._frame_buffer is None:
+            self._frame_buffer = FrameBuffer(self.config.frame_size)
+        return self._frame_buffer
+
+    def render_name(self, name, font, bg_frame=None):
+        """把名字渲染到复用的 BGR 帧缓冲区并返回它；视频背景需传入当前的背景帧。
+
+        返回的数组会在下一次调用时被覆盖。开启自动字号时 font 只提供默认字号，实际字号按名字长度选择。
+        """
+        cfg = self.config
+        buffer = self.frame_buffer
+        timer = self.timer
+        if cfg.auto_fit:
+            t0 = timer.start()
+            font = self.fitter.font_for(name)
+            timer.stop('text_fit', t0)
+        t0 = timer.start()
+        buffer.fill(self.background.bgr if bg_frame is None else bg_frame)
+        t1 = timer.start()
+        timer.stop('background', t0)
+        # 同一名字/字体/字号/颜色只渲染一次，之后直接在缓冲区里做 alpha 混合
+        layer = self.text_cache.get(name, font, cfg.text_color)
+        t2 = timer.start()
+        timer.stop('text_layout', t1)
+        frame = buffer.blend(layer, layer.centered_origin(cfg.frame_size))
+        timer.stop('blend', t2)
+        return frame
+
+    def iter_name_frames(self, name, font, video=None):
+        """依次生成一个名字的全部帧，每项为 (帧, 连续重复次数)。
+
+        静态背景下每个名字只渲染一次，以 (帧, frames_per_name) 的形式交给输出后端；
+        视频背景下每一帧都取新的背景帧，让背景在名字停留期间持续播放。
+        """
+        frames_per_name = self.config.frames_per_name
+        if self.config.has_effects:
+            yield from self._iter_effect_frames(name, font, video)
+        elif video is None:
+            yield self.render_name(name, font), frames_per_name
+        else:
+            timer = self.timer
+            for _ in range(frames_per_name):
+                t0 = timer.start()
+                bg_frame = video.read()
+                timer.stop('video_decode', t0)
+                yield self.render_name(name, font, bg_frame), 1
+
+    @property
+    def effects(self):
+        if self._effects is None:
+            self._effects = EffectRenderer(self.config.frame_size, self.config.effect_batch)
+        return self._effects
+
+    def _iter_effect_frames(self, name, font, video=None):
+        """带逐帧特效时一个名字的全部帧：特效参数整体算好，有变化的连续帧按批合成。
+
+        没有变化的帧（例如只开启淡入淡出时的中间部分）按普通方式渲染，静态背景下只渲染一次并重复使用。
+        """
+        cfg = self.config
+        timer = self.timer
+        if cfg.auto_fit:
+            t0 = timer.start()
+            font = self.fitter.font_for(name)
+            timer.stop('text_fit', t0)
+        t0 = timer.start()
+        layer = self.text_cache.get(name, font, cfg.text_color)
+        origin = layer.centered_origin(cfg.frame_size)
+        plan = plan_effects(cfg.frames_per_name, cfg.fade_frames, cfg.zoom, cfg.jitter,
+                            rng=name_rng(cfg.seed, name))
+        timer.stop('text_layout', t0)
+        effects = self.effects
+        count = len(plan)
+        start = 0
+        while start < count:
+            if plan.identity[start]:
+                if video is None:
+                    stop = start + 1
+                    while stop < count and plan.identity[stop]:
+                        stop += 1
+                    yield self.render_name(name, font), stop - start
+                else:
+                    stop = start + 1
+                    t0 = timer.start()
+                    bg_frame = video.read()
+                    timer.stop('video_decode', t0)
+                    yield self.render_name(name, font, bg_frame), 1
+                start = stop
+                continue
+            stop = start + 1
+            while stop < count and stop - start < effects.batch and not plan.identity[stop]:
+                stop += 1
+            if video is None:
+                backgrounds = self.background.bgr
+            else:
+                backgrounds = []
+                for _ in range(stop - start):
+                    t0 = timer.start()
+                    backgrounds.append(video.read())
+                    timer.stop('video_decode', t0)
+            t0 = timer.start()
+            frames = effects.render(layer, origin, plan, start, stop, backgrounds)
+            timer.stop('effects', t0)
+            for frame in frames:
+                yield frame, 1
+            start = stop
+
+    def open_writer(self, output_path=None):
+        cfg = self.config
+        # 只有静态背景且没有逐帧特效时每个名字的帧完全相同，才能使用保持帧模式
+        hold = cfg.frames_per_name if cfg.hold_frames and cfg.bg_type != BG_VIDEO and not cfg.has_effects else 1
+        return create_writer(output_path or cfg.output_path, cfg.fps, cfg.frame_size, writer=cfg.writer,
+                             codec=cfg.codec, crf=cfg.crf, preset=cfg.preset,
+                             hold_frames=hold, ffmpeg_path=cfg.ffmpeg_path, pixel_format=cfg.pixel_format,
+                             text_color=self.output_text_color, stream_slots=cfg.stream_slots).open()
+
+    def iter_frames(self, names, font, video=None):
+        """按顺序产出 (名字, 帧, 连续重复次数)。
+
+        workers 不为 1 且背景为静态时，名字帧在进程池中渲染后按原顺序交回；
+        视频背景需要顺序解码，开启逐帧特效时每个名字有多帧，这两种情况始终在当前进程渲染。
+        """
+        cfg = self.config
+        if video is None and cfg.workers != 1 and not cfg.has_effects:
+            from .parallel import render_parallel
+            frames = render_parallel(cfg, names, workers=cfg.workers,
+                                     max_in_flight=cfg.max_in_flight, batch_size=cfg.batch_size)
+            for name, frame in self.timer.iterate(frames, 'parallel_wait'):
+                yield name, frame, cfg.frames_per_name
+            return
+        for name in self.timer.iterate(names, 'names'):
+            for frame, repeat in self.iter_name_frames(name, font, video):
+                yield name, frame, repeat
+
+    def render(self, names=None):
+        """渲染并编码整段视频，返回写入的帧数。
+
+        names 为空时从 config.name_file_path 流式读取：读到第一个名字就开始渲染，
+        总帧数按已读取的字节数估算，随读取进度不断修正。分段编码需要预先知道名单长度，
+        此时会先把名单全部读入。
+
+        调用 self.progress.cancel() 可以在任意线程中取消渲染，render 会抛出 RenderCancelled。
+        按配置记录各阶段耗时、cProfile 和 tracemalloc 数据，结束后可通过 report() 获取。
+        """
+        cfg = self.config
+        profiler = None
+        if cfg.profile_path:
+            import cProfile
+            profiler = cProfile.Profile()
+        if cfg.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                frames = self._render(names)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    profiler.dump_stats(cfg.profile_path)
+        finally:
+            self.elapsed = time.perf_counter() - started
+            if cfg.trace_memory:
+                self.memory = _memory_summary(tracemalloc)
+                tracemalloc.stop()
+        if cfg.timing_report:
+            with open(cfg.timing_report, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return frames
+
+    def report(self):
+        """本次渲染的统计：帧数、耗时、各阶段计时、缓存命中情况和内存分配（可直接写成 JSON）。
+
+        多进程渲染和分段编码时，子进程中的阶段耗时不计入。
+        """
+        frames = self.progress.current_frame
+        report = {
+            'frames': frames,
+            'seconds': self.elapsed,
+            'frames_per_sec': frames / self.elapsed if self.elapsed else 0.0,
+            'stages': self.timer.summary(),
+            'text_cache': self.text_cache.stats(),
+        }
+        if self.render_cache is not None:
+            report['render_cache'] = self.render_cache.stats()
+        if self.memory is not None:
+            report['memory'] = self.memory
+        return report
+
+    def _render(self, names=None):
+        cfg = self.config
+        source = None
+        if names is None:
+            names = source = self.open_names()
+        if cfg.writer in STREAM_WRITERS and (cfg.segments != 1 or cfg.checkpoint_names or cfg.cache_dir
+                                             or cfg.targets):
+            raise ValueError("原始帧输出不能与分段编码、检查点续传、渲染缓存或多输出同时使用")
+        if cfg.cache_dir and (cfg.segments != 1 or cfg.checkpoint_names):
+            raise ValueError("渲染缓存不能与分段编码或检查点续传同时使用")
+        if cfg.targets:
+            if cfg.segments != 1 or cfg.checkpoint_names or cfg.cache_dir:
+                raise ValueError("多输出渲染不能与分段编码、检查点续传或渲染缓存同时使用")
+            if cfg.has_effects:
+                raise ValueError("多输出渲染暂不支持逐帧特效")
+            return render_targets(self, names, source)
+        if cfg.segments != 1:
+            if cfg.checkpoint_names:
+                raise ValueError("分段编码与检查点续传不能同时使用")
+            from .segments import render_segmented
+            return render_segmented(cfg, list(names), self.progress, cfg.segments)
+        if cfg.checkpoint_names:
+            return self._render_checkpointed(names, source)
+        if cfg.cache_dir:
+            return self._render_cached(names, source)
+
+        font = self.load_font()
+        out = self.open_writer()
+
+        frames_per_name = cfg.frames_per_name
+        progress = self.progress
+        progress.start(0 if source is not None else len(names) * frames_per_name)
+
+        video = self.open_video_background() if cfg.bg_type == BG_VIDEO else None
+        try:
+            for name, frame, repeat in self.iter_frames(names, font, video):
+                self.update_estimated_total(source, frames_per_name)
+                progress.set_name(name)
+                t0 = self.timer.start()
+                out.write(frame, repeat)
+                self.timer.stop('encode', t0)
+                progress.advance(repeat)
+        except BaseException:
+            out.abort()
+            raise
+        else:
+            out.close()
+        finally:
+            if video is not None:
+                video.close()
+        if source is not None:
+            progress.set_total(progress.current_frame)
+        progress.finish()
+        return progress.current_frame
+
+    def update_estimated_total(self, source, frames_per_name):
+        """流式读取名单时，按已读取字节估算的名字数修正总帧数（source 为空表示名单长度已知）。"""
+        if source is not None:
+            estimated = source.estimated_count
+            if estimated is not None:
+                self.progress.set_total(estimated * frames_per_name)
+
+    @staticmethod
+    def _discard_partial(writer, path):
+        # 渲染中止时丢弃没写完的分块：中止写入并删除文件
+        if writer is None:
+            return
+        try:
+            writer.abort()
+        except Exception:
+            pass
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _render_checkpointed(self, names, source=None):
+        """分块渲染：每个分块是一个完整的视频文件，写完后记录到检查点清单，最后无损拼接。
+
+        续传时跳过清单中已完成的名字（并核对这些名字与上次一致），沿用记录的随机种子，
+        视频背景从相同位置继续，因此得到的视频与一次性渲染完全相同。
+        """
+        cfg = self.config
+        ffmpeg = find_ffmpeg(cfg.ffmpeg_path)
+        if ffmpeg is None:
+            raise RuntimeError("检查点续传需要 ffmpeg 拼接分块，请安装 ffmpeg")
+        manifest = CheckpointManifest.open(cfg, resume=cfg.resume)
+        frames_per_name = cfg.frames_per_name
+        skipped = manifest.completed_names
+
+        names = iter(names)
+        digest = hashlib.sha256()
+        for _ in range(skipped):
+            name = next(names, None)
+            if name is None:
+                raise ValueError("名单比检查点记录的更短，无法续传")
+            names_digest_update(digest, name)
+        if digest.hexdigest() != manifest.data['names_digest']:
+            raise ValueError("名单内容与检查点不一致，无法续传")
+
+        font = self.load_font()
+        progress = self.progress
+        progress.start(0, completed_frames=skipped * frames_per_name)
+
+        writer = None
+        chunk_path = None
+        chunk_names = 0
+        frames_in_name = 0
+        video = None
+        if cfg.bg_type == BG_VIDEO:
+            video = self.open_video_background(seed=manifest.seed, skip_frames=skipped * frames_per_name)
+        try:
+            for name, frame, repeat in self.iter_frames(names, font, video):
+                if writer is None:
+                    chunk_path = manifest.next_chunk_path()
+                    writer = self.open_writer(chunk_path)
+                self.update_estimated_total(source, frames_per_name)
+                progress.set_name(name)
+                t0 = self.timer.start()
+                writer.write(frame, repeat)
+                self.timer.stop('encode', t0)
+                progress.advance(repeat)
+                frames_in_name += repeat
+                if frames_in_name < frames_per_name:
+                    continue
+                frames_in_name = 0
+                names_digest_update(digest, name)
+                chunk_names += 1
+                if chunk_names == cfg.checkpoint_names:
+                    writer.close()
+                    writer = None
+                    manifest.add_chunk(chunk_path, chunk_names, digest.hexdigest())
+                    chunk_names = 0
+            if writer is not None:
+                writer.close()
+                writer = None
+                manifest.add_chunk(chunk_path, chunk_names, digest.hexdigest())
+        except BaseException:
+            # 没写完的分块直接丢弃，清单里只保留完整的分块，下次从这里继续
+            self._discard_partial(writer, chunk_path)
+            raise
+        finally:
+            if video is not None:
+                video.close()
+
+        if not manifest.chunks:
+            raise ValueError("名单为空，没有可以输出的内容")
+        from .segments import concat_segments
+        concat_segments(manifest.chunks, cfg.output_path, ffmpeg)
+        manifest.remove()
+        progress.set_total(progress.current_frame)
+        progress.finish()
+        return progress.current_frame
+
+    def _render_cached(self, names, source=None):
+        """增量渲染：名单按内容切成分块，缓存中已有的分块直接复用，只编码变化的分块，最后无损拼接。
+
+        静态背景时分块与位置无关，插入或删除名字只影响所在的分块；视频背景的分块还取决于
+        起始帧，插入点之后的分块需要重新编码。没有固定随机种子的随机起点每次都不同，不会命中缓存。
+        """
+        cfg = self.config
+        ffmpeg = find_ffmpeg(cfg.ffmpeg_path)
+        if ffmpeg is None:
+            raise RuntimeError("渲染缓存需要 ffmpeg 拼接分块，请安装 ffmpeg")
+        cache = self.render_cache = RenderCache(cfg.cache_dir, cfg.cache_bytes)
+        is_video = cfg.bg_type == BG_VIDEO
+        seed = resolve_seed(cfg.seed, is_video and cfg.bg_random_start)
+        fingerprint = render_fingerprint(cfg, seed, video=is_video)
+        ext = os.path.splitext(cfg.output_path)[1] or '.mp4'
+        frames_per_name = cfg.frames_per_name
+        progress = self.progress
+        progress.start(0 if source is not None else len(names) * frames_per_name)
+
+        # 每个分块为 [键, 缓存路径, 名字列表]；未命中的分块在编码完成后填入路径
+        plan = []
+        pending = []
+        video = None
+        position = {'frame': 0, 'video': 0}
+
+        def missing_names():
+            # 按顺序决定每个分块是否命中，只把未命中分块的名字交给渲染流水线
+            for block in iter_blocks(names, cfg.cache_block_names):
+                start = position['frame']
+                position['frame'] += len(block) * frames_per_name
+                key = cache.block_key(fingerprint, block, start if is_video else None)
+                entry = [key, cache.lookup(key, ext), block]
+                plan.append(entry)
+                self.update_estimated_total(source, frames_per_name)
+                if entry[1] is not None:
+                    cache.hits += 1
+                    cache.hit_frames += len(block) * frames_per_name
+                    progress.set_name(block[-1])
+                    progress.advance(len(block) * frames_per_name)
+                    continue
+                cache.misses += 1
+                pending.append(entry)
+                if video is not None and position['video'] != start:
+                    # 跳过了命中的分块，视频背景需要定位到这个分块的起始帧
+                    video.seek(start)
+                position['video'] = position['frame']
+                yield from block
+
+        font = self.load_font()
+        if is_video:
+            video = self.open_video_background(seed=seed)
+        writer = None
+        partial = None
+        block_names = 0
+        frames_in_name = 0
+        try:
+            for name, frame, repeat in self.iter_frames(missing_names(), font, video):
+                entry = pending[0]
+                if writer is None:
+                    partial = cache.partial_path(entry[0], ext)
+                    writer = self.open_writer(partial)
+                progress.set_name(name)
+                t0 = self.timer.start()
+                writer.write(frame, repeat)
+                self.timer.stop('encode', t0)
+                progress.advance(repeat)
+                frames_in_name += repeat
+                if frames_in_name < frames_per_name:
+                    continue
+                frames_in_name = 0
+                block_names += 1
+                if block_names == len(entry[2]):
+                    writer.close()
+                    writer = None
+                    entry[1] = cache.commit(partial, entry[0], ext)
+                    cache.encoded_frames += block_names * frames_per_name
+                    pending.pop(0)
+                    block_names = 0
+        except BaseException:
+            self._discard_partial(writer, partial)
+            raise
+        finally:
+            if video is not None:
+                video.close()
+
+        if not plan:
+            raise ValueError("名单为空，没有可以输出的内容")
+        from .segments import concat_segments
+        concat_segments([path for _, path, _ in plan], cfg.output_path, ffmpeg,
+                        list_path=cfg.output_path + '.ffconcat')
+        cache.evict(keep={key for key, _, _ in plan})
+        if source is not None:
+            progress.set_total(progress.current_frame)
+        progress.finish()
+        return progress.current_frame
+
+
+def _memory_summary(tracemalloc, limit=10):
+    # 峰值内存和分配最多的代码位置
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+    return {
+        'current_bytes': current,
+        'peak_bytes': peak,
+        'top_allocations': [
+            {'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             'size_bytes': stat.size, 'count': stat.count}
+            for stat in top
+        ],
+    }
@@ -0,0 +1,26 @@
+import numpy as np
+
+from .text import blend_layer
+
+
+class FrameBuffer:
+    """可反复使用的 BGR 帧缓冲区，每个渲染线程/进程持有一块。
+
+    背景通过 np.copyto 写入、文字在原地混合，得到的 array 直接交给编码器，
+    整个过程不再产生与帧同尺寸的临时数组。array 会在下一次 fill 时被覆盖，
+    需要保留结果时请自行复制。
+    """
+
+    def __init__(self, frame_size):
+        width, height = frame_size
+        self.frame_size = frame_size
+        self.array = np.empty((height, width, 3), dtype=np.uint8)
+        self._scratch = (np.empty((height, width, 3), dtype=np.uint16),
+                         np.empty((height, width, 3), dtype=np.uint16))
+
+    def fill(self, background):
+        np.copyto(self.array, background)
+        return self.array
+
+    def blend(self, layer, origin):
+        return blend_layer(self.array, layer, origin, scratch=self._scratch)
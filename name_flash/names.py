@@ -0,0 +1,58 @@
+import os
+import stat
+import sys
+
+STDIN_PATH = '-'
+
+
+class NameSource:
+    """惰性逐行读取名字，支持普通文件、标准输入（'-'）和命名管道。
+
+    读取时去掉首尾空白和 UTF-8 BOM、跳过空行，读到第一行就可以开始渲染，
+    不需要把整个名单放进内存。普通文件可以根据已读取的字节数估算名字总数。
+    """
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.count = 0
+        self.bytes_read = 0
+        self.total_bytes = None
+        self.exhausted = False
+
+    def _open(self):
+        if self.path == STDIN_PATH:
+            return sys.stdin.buffer, False
+        f = open(self.path, 'rb')
+        st = os.fstat(f.fileno())
+        if stat.S_ISREG(st.st_mode):
+            self.total_bytes = st.st_size
+        return f, True
+
+    def __iter__(self):
+        f, owned = self._open()
+        try:
+            first = True
+            for raw in f:
+                self.bytes_read += len(raw)
+                line = raw.decode(self.encoding, errors='replace')
+                if first:
+                    line = line.lstrip('\ufeff')
+                    first = False
+                name = line.strip()
+                if name:
+                    self.count += 1
+                    yield name
+            self.exhausted = True
+        finally:
+            if owned:
+                f.close()
+
+    @property
+    def estimated_count(self):
+        """名字总数的估计值；读完后为精确值，无法估计（管道、标准输入）时为 None。"""
+        if self.exhausted:
+            return self.count
+        if not self.total_bytes or not self.bytes_read or not self.count:
+            return None
+        return max(self.count, round(self.count * self.total_bytes / self.bytes_read))
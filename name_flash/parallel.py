@@ -0,0 +1,76 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+from PIL import ImageFont
+
+# 每个子进程持有的渲染器与字体（由 _init_worker 创建，整个进程生命周期内复用）
+_worker_renderer = None
+_worker_font = None
+
+
+def resolve_workers(workers):
+    """0 或负数表示使用全部 CPU 核心。"""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _init_worker(config):
+    global _worker_renderer, _worker_font
+    from .engine import NameVideoRenderer
+    _worker_renderer = NameVideoRenderer(config)
+    _worker_font = ImageFont.truetype(config.font_path, config.text_size)
+    # 预先准备好背景，避免第一批任务承担解码开销
+    _worker_renderer.background
+
+
+def _render_batch(names):
+    # 渲染器内部复用同一块帧缓冲区，这里逐个复制到结果数组中再整体发回主进程
+    renderer = _worker_renderer
+    frames = np.empty((len(names),) + renderer.frame_buffer.array.shape, dtype=np.uint8)
+    for i, name in enumerate(names):
+        frames[i] = renderer.render_name(name, _worker_font)
+    return frames
+
+
+def _batches(names, batch_size):
+    it = iter(names)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def render_parallel(config, names, workers=0, max_in_flight=0, batch_size=8):
+    """在进程池中渲染静态背景的名字帧，按原始顺序依次产出 (名字, BGR 帧)。
+
+    每个子进程只加载一次字体和背景；任务按批提交，同时在途的批次不超过 max_in_flight，
+    主进程按提交顺序取回结果，因此输出顺序与单进程完全一致，内存占用也有上限。
+    """
+    workers = resolve_workers(workers)
+    max_in_flight = max_in_flight if max_in_flight > 0 else workers * 2
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config,)) as pool:
+        try:
+            for batch in _batches(names, batch_size):
+                if len(pending) >= max_in_flight:
+                    yield from _drain_one(pending)
+                pending.append((batch, pool.submit(_render_batch, batch)))
+            while pending:
+                yield from _drain_one(pending)
+        finally:
+            # 提前结束（出错或被取消）时丢弃尚未开始的任务
+            for _, future in pending:
+                future.cancel()
+
+
+def _drain_one(pending):
+    batch, future = pending.popleft()
+    frames = future.result()
+    for name, frame in zip(batch, frames):
+        yield name, frame
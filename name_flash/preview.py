@@ -0,0 +1,140 @@
+import itertools
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from .background import PreparedBackground, VideoBackgroundSource, fit_image
+from .constants import BG_IMAGE, BG_VIDEO
+from .engine import NameVideoRenderer
+from .names import NameSource
+from .resources import SharedResources
+from .targets import OutputTarget
+
+# 预览画面的最大尺寸：更大的分辨率按比例缩小后渲染，更小的分辨率按整数倍放大显示
+PREVIEW_MAX_SIZE = (384, 216)
+# 从名单开头取多少个名字挑选预览用的名字（取其中最长的一个，最容易看出是否超出画面）
+PREVIEW_SAMPLE_NAMES = 200
+# 没有名单时显示的名字
+DEFAULT_PREVIEW_NAME = '预览效果'
+# 缓存的字体、背景原图、缩放后背景的数量上限（各自独立计数）
+PREVIEW_CACHE_ENTRIES = 8
+
+
+def preview_size(frame_size, max_size=PREVIEW_MAX_SIZE):
+    """按比例缩小到 max_size 以内的预览尺寸（不放大）。"""
+    width, height = frame_size
+    scale = min(1.0, max_size[0] / width, max_size[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _file_key(path):
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _remember(table, key, value, max_entries=PREVIEW_CACHE_ENTRIES):
+    table[key] = value
+    table.move_to_end(key)
+    while len(table) > max_entries:
+        table.popitem(last=False)
+    return value
+
+
+@dataclass
+class PreviewFrame:
+    """一次预览的结果：rgb 为放大到显示尺寸的 RGB 图像。"""
+    rgb: np.ndarray
+    name: str
+    frame_size: tuple
+    render_size: tuple
+    seconds: float
+
+
+class PreviewResources(SharedResources):
+    """预览专用的共享资源：背景图片/视频第一帧只解码一次并预先缩小，改变分辨率或填充方式时直接重新缩放。
+
+    文件被修改后（修改时间或大小变化）重新解码。图片加载失败时抛出异常，由界面显示错误。
+    输入字号、颜色时每个中间值都会渲染一次，所有缓存都只保留最近使用的 PREVIEW_CACHE_ENTRIES 项。
+    """
+
+    def __init__(self, max_size=PREVIEW_MAX_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.max_size = max_size
+        self._fonts = OrderedDict()
+        self._backgrounds = OrderedDict()
+        self._sources = OrderedDict()
+        self._fitted = OrderedDict()
+
+    def font(self, path, size):
+        return _remember(self._fonts, (path, size), super().font(path, size))
+
+    def source_image(self, bg_type, path):
+        key = (bg_type,) + _file_key(path)
+        image = self._sources.get(key)
+        if image is None:
+            if bg_type == BG_VIDEO:
+                with VideoBackgroundSource(path, None, prefetch=1) as video:
+                    image = Image.fromarray(np.ascontiguousarray(video.read()[..., ::-1]))
+            else:
+                with Image.open(path) as img:
+                    image = img.convert('RGB')
+            # 预览最大只有 max_size，保留两倍的余量后缩小原图，之后每次重新缩放都很快
+            image.thumbnail((self.max_size[0] * 2, self.max_size[1] * 2), Image.LANCZOS)
+        return _remember(self._sources, key, image)
+
+    def background(self, renderer):
+        cfg = renderer.config
+        if cfg.bg_type not in (BG_IMAGE, BG_VIDEO):
+            key = (cfg.bg_type, cfg.bg_value, tuple(cfg.frame_size), cfg.bg_fit)
+            return _remember(self._backgrounds, key, super().background(renderer))
+        key = (cfg.bg_type,) + _file_key(cfg.bg_value) + (tuple(cfg.frame_size), cfg.bg_fit)
+        background = self._fitted.get(key)
+        if background is None:
+            source = self.source_image(cfg.bg_type, cfg.bg_value)
+            background = PreparedBackground(np.asarray(fit_image(source, tuple(cfg.frame_size), cfg.bg_fit)))
+        return _remember(self._fitted, key, background)
+
+
+class PreviewRenderer:
+    """界面的实时预览：用与正式渲染相同的引擎，在缩小的分辨率下只渲染一个名字的一帧。
+
+    字体、背景、文字图层都缓存在 resources 中，只修改颜色、字号等设置时不必重新加载。
+    只在单个线程中使用。
+    """
+
+    def __init__(self, max_size=PREVIEW_MAX_SIZE):
+        self.max_size = max_size
+        self.resources = PreviewResources(max_size)
+        self._sample_names = {}
+
+    def sample_name(self, path):
+        """名单开头若干个名字中最长的一个；名单不存在或为空时返回 DEFAULT_PREVIEW_NAME。"""
+        try:
+            key = _file_key(path)
+        except OSError:
+            return DEFAULT_PREVIEW_NAME
+        name = self._sample_names.get(key)
+        if name is None:
+            names = list(itertools.islice(NameSource(path), PREVIEW_SAMPLE_NAMES))
+            name = self._sample_names[key] = max(names, key=len) if names else DEFAULT_PREVIEW_NAME
+        return name
+
+    def render(self, config, name=None):
+        """按 config 渲染预览帧；name 为空时从 config 的名单中挑选。"""
+        started = time.perf_counter()
+        if name is None:
+            name = self.sample_name(config.name_file_path)
+        size = preview_size(config.frame_size, self.max_size)
+        # 与多输出相同的规则缩放文字大小，预览中名字与画面的比例和正式输出一致
+        cfg = OutputTarget(config.output_path, frame_size=size).apply(config)
+        renderer = NameVideoRenderer(cfg, resources=self.resources)
+        rgb = renderer.render_name(name, renderer.load_font())[..., ::-1]
+        zoom = max(1, min(self.max_size[0] // size[0], self.max_size[1] // size[1]))
+        if zoom > 1:
+            rgb = rgb.repeat(zoom, axis=0).repeat(zoom, axis=1)
+        return PreviewFrame(np.ascontiguousarray(rgb), name, tuple(config.frame_size), size,
+                            time.perf_counter() - started)
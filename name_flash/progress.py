@@ -0,0 +1,126 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# 默认最多每 0.1 秒发出一次进度事件
+DEFAULT_PROGRESS_INTERVAL = 0.1
+
+
+class RenderCancelled(Exception):
+    """渲染被用户取消。"""
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    current_frame: int
+    total_frames: int
+    elapsed: float
+    frames_per_sec: float
+    eta_seconds: Optional[float]
+    current_name: Optional[str]
+    finished: bool = False
+    # 开启阶段计时时为各阶段的统计摘要（见 StageTimer.summary）
+    stages: Optional[dict] = None
+
+    @property
+    def percent(self):
+        if not self.total_frames:
+            return 100.0 if self.finished else 0.0
+        return min(100.0, self.current_frame / self.total_frames * 100)
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return '--:--:--'
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressChannel:
+    """渲染进度通道：编码线程只累加计数器，按限定频率生成进度事件。
+
+    - 每次 advance 只做计数和一次时间比较，不会调用任何界面代码；
+    - 距上次事件超过 min_interval 秒，或进度前进超过 min_percent 个百分点时才生成新事件；
+    - callback（如果有）在编码线程中被调用，只适合做打印等轻量操作；
+    - 界面线程通过 snapshot() 轮询最新事件（例如 tkinter 的 root.after），无需加锁；
+    - 任意线程调用 cancel() 后，编码线程在下一次 advance 时抛出 RenderCancelled。
+    """
+
+    def __init__(self, callback=None, min_interval=DEFAULT_PROGRESS_INTERVAL, min_percent=None):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.min_percent = min_percent
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._event = ProgressEvent(0, 0, 0.0, 0.0, None, None)
+        # 渲染器开启阶段计时时设置，事件中附带各阶段的统计
+        self.timer = None
+        self.start(0)
+
+    def start(self, total_frames, completed_frames=0):
+        """开始计时；completed_frames 为续传时已完成的帧数，不计入帧率。"""
+        self.total_frames = total_frames
+        self.current_frame = completed_frames
+        self._start_frame = completed_frames
+        self.current_name = None
+        self._started = time.monotonic()
+        self._last_time = self._started
+        self._last_frame = 0
+        self._frame_step = None
+        if self.min_percent and total_frames:
+            self._frame_step = max(1, int(total_frames * self.min_percent / 100))
+
+    def set_total(self, total_frames):
+        self.total_frames = total_frames
+        if self.min_percent and total_frames:
+            self._frame_step = max(1, int(total_frames * self.min_percent / 100))
+
+    def set_name(self, name):
+        self.current_name = name
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise RenderCancelled("渲染已取消")
+
+    def advance(self, frames=1):
+        self.check_cancelled()
+        self.current_frame += frames
+        now = time.monotonic()
+        if self.min_interval is not None and now - self._last_time >= self.min_interval:
+            self._emit(now)
+        elif self._frame_step is not None and self.current_frame - self._last_frame >= self._frame_step:
+            self._emit(now)
+
+    def finish(self):
+        self._emit(time.monotonic(), finished=True)
+
+    def _emit(self, now, finished=False):
+        elapsed = now - self._started
+        fps = (self.current_frame - self._start_frame) / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if finished:
+            eta = 0.0
+        elif fps > 0 and self.total_frames:
+            eta = max(0.0, (self.total_frames - self.current_frame) / fps)
+        stages = self.timer.summary() if self.timer is not None else None
+        event = ProgressEvent(self.current_frame, self.total_frames, elapsed, fps, eta,
+                              self.current_name, finished, stages)
+        with self._lock:
+            self._event = event
+            self._last_time = now
+            self._last_frame = self.current_frame
+        if self.callback is not None:
+            self.callback(event)
+
+    def snapshot(self):
+        """返回最近一次生成的进度事件（可在任意线程调用）。"""
+        with self._lock:
+            return self._event
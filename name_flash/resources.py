@@ -0,0 +1,42 @@
+from PIL import ImageFont
+
+from .text import DEFAULT_TEXT_CACHE_BYTES, TextLayerCache
+
+
+class SharedResources:
+    """多个渲染任务共用的资源：已加载的字体、准备好的静态背景和文字图层/字形缓存。
+
+    批量渲染时，同一进程中设置相同的任务不必重复打开字体文件、解码缩放背景，
+    也能直接复用前面任务已经光栅化的字形。只在单个线程中使用。
+    """
+
+    def __init__(self, text_cache_bytes=DEFAULT_TEXT_CACHE_BYTES):
+        self.text_cache_bytes = text_cache_bytes
+        self._fonts = {}
+        self._backgrounds = {}
+        self._text_caches = {}
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = ImageFont.truetype(path, size)
+        return font
+
+    def background(self, renderer):
+        cfg = renderer.config
+        key = (cfg.bg_type, cfg.bg_value, tuple(cfg.frame_size), cfg.bg_fit)
+        background = self._backgrounds.get(key)
+        if background is None:
+            background = self._backgrounds[key] = renderer.prepare_background()
+        return background
+
+    def text_cache(self, use_atlas=True, max_bytes=None):
+        """按字形图集开关和容量上限共用文字缓存；max_bytes 为空时使用 text_cache_bytes。"""
+        if max_bytes is None:
+            max_bytes = self.text_cache_bytes
+        key = (use_atlas, max_bytes)
+        cache = self._text_caches.get(key)
+        if cache is None:
+            cache = self._text_caches[key] = TextLayerCache(max_bytes, use_atlas=use_atlas)
+        return cache
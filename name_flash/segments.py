@@ -0,0 +1,160 @@
+import dataclasses
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+from .background import resolve_seed
+from .parallel import resolve_workers
+from .progress import DEFAULT_PROGRESS_INTERVAL, ProgressChannel, RenderCancelled
+from .writers import find_ffmpeg
+
+
+def split_segments(count, segments):
+    """把 count 个名字切成 segments 段连续区间，返回 [(起始下标, 结束下标), ...]。"""
+    segments = max(1, min(segments, count))
+    base, extra = divmod(count, segments)
+    bounds = []
+    start = 0
+    for i in range(segments):
+        end = start + base + (1 if i < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _quote_concat_path(path):
+    # ffconcat 列表中单引号需要写成 '\''
+    return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+
+def concat_segments(segment_paths, output_path, ffmpeg, list_path=None):
+    """用 ffmpeg 的 concat 分离器按流复制拼接各段，不重新编码。
+
+    list_path 为拼接列表的位置，默认放在第一段所在的目录，用完后删除。
+    """
+    if list_path is None:
+        list_path = os.path.join(os.path.dirname(segment_paths[0]), 'segments.ffconcat')
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write('ffconcat version 1.0\n')
+        for path in segment_paths:
+            f.write(f"file {_quote_concat_path(path)}\n")
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+           '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy']
+    if output_path.lower().endswith(('.mp4', '.mov')):
+        cmd += ['-movflags', '+faststart']
+    cmd.append(output_path)
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    finally:
+        os.remove(list_path)
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(f"拼接分段失败（退出码 {result.returncode}）：{message}")
+
+
+def _render_segment(config, names, index, events, cancel):
+    from .engine import NameVideoRenderer
+
+    # 每次汇报进度时顺便检查取消标志，正在编码的分段也能在一个进度间隔内停下
+    progress = ProgressChannel(min_interval=config.progress_interval or DEFAULT_PROGRESS_INTERVAL)
+
+    def report(event):
+        events.put((index, event.current_frame, event.current_name))
+        if cancel.is_set():
+            progress.cancel()
+
+    progress.callback = report
+    if cancel.is_set():
+        raise RenderCancelled("渲染已取消")
+    return NameVideoRenderer(config, progress=progress).render(names)
+
+
+def render_segmented(config, names, progress, segments=0):
+    """分段并行编码：每段在独立进程中渲染并编码到临时文件，最后无损拼接。
+
+    所有分段使用同一份配置（编码器、CRF、preset、帧率、分辨率完全一致），
+    视频背景按每段第一个名字的位置偏移起始帧，与整体渲染保持衔接。
+    成功或取消（包括 Ctrl-C）后删除临时分段；失败时保留它们，并在异常信息中给出所在目录。
+    """
+    ffmpeg = find_ffmpeg(config.ffmpeg_path)
+    if ffmpeg is None:
+        raise RuntimeError("分段编码需要 ffmpeg 进行无损拼接，请安装 ffmpeg")
+
+    frames_per_name = config.frames_per_name
+    bounds = split_segments(len(names), resolve_workers(segments))
+    progress.start(len(names) * frames_per_name)
+    if not names:
+        progress.finish()
+        return 0
+
+    # 各段必须选到同一个随机起点，才能与整体渲染的背景衔接
+    seed = resolve_seed(config.seed, config.bg_random_start)
+
+    output_dir = os.path.dirname(os.path.abspath(config.output_path))
+    work_dir = tempfile.mkdtemp(prefix='.segments-', dir=output_dir)
+    ext = os.path.splitext(config.output_path)[1] or '.mp4'
+    jobs = []
+    for i, (start, end) in enumerate(bounds):
+        segment_config = dataclasses.replace(
+            config,
+            output_path=os.path.join(work_dir, f'segment_{i:04d}{ext}'),
+            workers=1,
+            segments=1,
+            seed=seed,
+            bg_start_offset=config.bg_start_offset + start * frames_per_name,
+        )
+        jobs.append((segment_config, names[start:end]))
+
+    try:
+        with multiprocessing.Manager() as manager:
+            events = manager.Queue()
+            cancel = manager.Event()
+            with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+                futures = [pool.submit(_render_segment, cfg, seg_names, i, events, cancel)
+                           for i, (cfg, seg_names) in enumerate(jobs)]
+                done_frames = [0] * len(jobs)
+                try:
+                    while True:
+                        finished, pending = wait(futures, timeout=progress.min_interval or 0.1,
+                                                 return_when=FIRST_EXCEPTION)
+                        _collect_events(events, done_frames, progress)
+                        progress.check_cancelled()
+                        for f in finished:
+                            if f.exception() is not None:
+                                f.result()
+                        if not pending:
+                            break
+                except BaseException:
+                    # 取消、失败或 Ctrl-C：通知正在编码的分段停下，进程池退出时只需等它们收尾
+                    cancel.set()
+                    for f in futures:
+                        f.cancel()
+                    raise
+        concat_segments([cfg.output_path for cfg, _ in jobs], config.output_path, ffmpeg)
+    except (RenderCancelled, KeyboardInterrupt):
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        raise RuntimeError(f"分段编码失败，临时分段保留在 {work_dir}：{e}") from e
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    progress.finish()
+    return progress.current_frame
+
+
+def _collect_events(events, done_frames, progress):
+    while True:
+        try:
+            index, current_frame, name = events.get_nowait()
+        except queue.Empty:
+            break
+        delta = current_frame - done_frames[index]
+        done_frames[index] = current_frame
+        if name is not None:
+            progress.set_name(name)
+        if delta:
+            progress.advance(delta)
@@ -0,0 +1,338 @@
+import struct
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .text import parse_color_bgr
+from .writers import DEFAULT_STREAM_SLOTS, PIX_BGR24, PIX_RGBA, PIXEL_FORMATS, STREAM_STDOUT, FrameWriter
+
+# 原始帧流的文件头：魔数、宽、高、帧率、每帧字节数、像素格式（ASCII，右侧补 0）
+STREAM_MAGIC = b'NFRAW1\0\0'
+STREAM_HEADER = struct.Struct('<8sIIII8s')
+# 共享内存环形缓冲区：文件头之后是 4 个 uint64 控制字（槽数、写序号、读序号、结束标志），帧数据从 64 字节处开始
+SHM_CONTROL_OFFSET = STREAM_HEADER.size
+SHM_DATA_OFFSET = 64
+# 等待对方读写时的轮询间隔（秒）
+STREAM_POLL_INTERVAL = 0.0005
+# 共享内存写入端等待读取端的时限（秒）：读序号这么久没有前进就认为读取端不在了，None 表示一直等待
+STREAM_READER_TIMEOUT = 30.0
+# 结束标志：正常结束（读完剩余的帧后停止）、写入端异常中止
+SHM_CLOSED, SHM_ABORTED = 1, 2
+
+_CHANNELS = {PIX_BGR24: 3, PIX_RGBA: 4}
+_CTRL_SLOTS, _CTRL_WRITE, _CTRL_READ, _CTRL_CLOSED = range(4)
+# 当前进程中由 SharedMemoryWriter 创建、尚未删除的共享内存
+_created_names = set()
+
+
+@dataclass
+class StreamInfo:
+    """原始帧流的格式：frame_size 为 (宽, 高)，pixel_format 为 bgr24 或 rgba。"""
+    frame_size: tuple
+    fps: int
+    pixel_format: str
+
+    @property
+    def channels(self):
+        return _CHANNELS[self.pixel_format]
+
+    @property
+    def shape(self):
+        return self.frame_size[1], self.frame_size[0], self.channels
+
+    @property
+    def frame_bytes(self):
+        return self.frame_size[0] * self.frame_size[1] * self.channels
+
+    def pack(self):
+        return STREAM_HEADER.pack(STREAM_MAGIC, self.frame_size[0], self.frame_size[1], self.fps,
+                                  self.frame_bytes, self.pixel_format.encode('ascii'))
+
+    @classmethod
+    def unpack(cls, data):
+        magic, width, height, fps, frame_bytes, pixel_format = STREAM_HEADER.unpack(bytes(data[:STREAM_HEADER.size]))
+        if magic != STREAM_MAGIC:
+            raise ValueError("不是名字闪烁的原始帧流（文件头不匹配）")
+        info = cls((width, height), fps, pixel_format.rstrip(b'\0').decode('ascii'))
+        if info.pixel_format not in PIXEL_FORMATS or info.frame_bytes != frame_bytes:
+            raise ValueError(f"无法识别的像素格式: {info.pixel_format}")
+        return info
+
+
+class _FrameConverter:
+    """把渲染好的 BGR 帧写成目标像素格式。
+
+    rgba 为只输出文字的透明模式：引擎在黑色背景上用白色渲染文字，得到的灰度正好是文字的 alpha，
+    RGB 通道固定为文字颜色（非预乘），只需每帧复制 alpha 通道。
+    """
+
+    def __init__(self, pixel_format, text_color):
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"不支持的像素格式: {pixel_format}")
+        self.pixel_format = pixel_format
+        self.rgb = parse_color_bgr(text_color)[::-1] if pixel_format == PIX_RGBA else None
+
+    def prepare(self, out):
+        """初始化输出缓冲区中每帧都不变的部分（rgba 的颜色通道）。"""
+        if self.rgb is not None:
+            out[..., :3] = self.rgb
+
+    def convert(self, frame, out):
+        if self.rgb is None:
+            np.copyto(out, frame)
+        else:
+            np.copyto(out[..., 3], frame[..., 0])
+
+
+class RawStreamWriter(FrameWriter):
+    """把原始帧写到标准输出（output_path 为 '-'）、命名管道或普通文件，开头是 StreamInfo 文件头。
+
+    文件头之后是连续的原始帧，与 ffmpeg 的 rawvideo 相同；写命名管道时会等到读取端打开为止，
+    读取端处理不过来时写入自然阻塞。
+    """
+
+    def __init__(self, output_path, fps, frame_size, pixel_format=PIX_BGR24, text_color='#ffffff'):
+        super().__init__(output_path, fps, frame_size)
+        self.info = StreamInfo(tuple(frame_size), fps, pixel_format)
+        self._converter = _FrameConverter(pixel_format, text_color)
+        self._file = None
+        self._owned = False
+        self._buffer = None
+
+    def open(self):
+        if self.output_path == STREAM_STDOUT:
+            self._file, self._owned = sys.stdout.buffer, False
+        else:
+            self._file, self._owned = open(self.output_path, 'wb'), True
+        if self.info.pixel_format != PIX_BGR24:
+            self._buffer = np.empty(self.info.shape, dtype=np.uint8)
+            self._converter.prepare(self._buffer)
+        self._write(self.info.pack())
+        return self
+
+    def _write(self, data):
+        try:
+            self._file.write(data)
+        except BrokenPipeError:
+            raise RuntimeError("原始帧流的读取端已关闭") from None
+
+    def write(self, frame, repeat=1):
+        if self._buffer is not None:
+            self._converter.convert(frame, self._buffer)
+            frame = self._buffer
+        data = memoryview(frame).cast('B')
+        for _ in range(repeat):
+            self._write(data)
+        self.frames_written += repeat
+
+    def close(self):
+        if self._file is None:
+            return
+        f, self._file = self._file, None
+        try:
+            f.flush()
+        except BrokenPipeError:
+            pass
+        finally:
+            if self._owned:
+                f.close()
+
+
+def _attach_shared_memory(name):
+    """附加到已有的共享内存；读取端不登记到 resource_tracker，退出时不会误删写入端的缓冲区。
+
+    写入端在同一进程中时，登记属于写入端（unlink 时注销），这里不能注销。
+    """
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python 3.13 之前没有 track 参数
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created_names:
+            try:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+        return shm
+
+
+class _Ring:
+    """共享内存中的环形缓冲区视图：文件头、控制字和 slots 个帧槽（numpy 数组，直接指向共享内存）。"""
+
+    def __init__(self, shm, info, slots):
+        self.shm = shm
+        self.info = info
+        self.control = np.ndarray((4,), dtype=np.uint64, buffer=shm.buf, offset=SHM_CONTROL_OFFSET)
+        self.frames = np.ndarray((slots,) + info.shape, dtype=np.uint8, buffer=shm.buf, offset=SHM_DATA_OFFSET)
+
+    @staticmethod
+    def size(info, slots):
+        return SHM_DATA_OFFSET + slots * info.frame_bytes
+
+    def release(self):
+        # 共享内存关闭前必须先释放指向它的 numpy 视图
+        self.control = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # 使用方还持有某一帧的数组，映射在这些数组释放后自动解除
+            pass
+
+
+class SharedMemoryWriter(FrameWriter):
+    """把原始帧写入 multiprocessing.shared_memory 中的环形缓冲区，output_path 为共享内存的名字。
+
+    单写单读：写入端每写完一帧把写序号加 1，读取端（SharedMemoryReader）用完一帧把读序号加 1；
+    所有槽都未被读取时写入端等待（背压），不会覆盖读取端还没处理的帧。close 时设置结束标志，
+    等读取端取完剩余的帧后再删除共享内存。读序号超过 timeout 秒没有前进（读取端没有启动或已退出）时
+    抛出 RuntimeError；渲染出错或被取消时 abort 不再等待，立即删除共享内存。
+    """
+
+    def __init__(self, output_path, fps, frame_size, pixel_format=PIX_BGR24, text_color='#ffffff',
+                 slots=DEFAULT_STREAM_SLOTS, poll_interval=STREAM_POLL_INTERVAL, timeout=STREAM_READER_TIMEOUT):
+        super().__init__(output_path, fps, frame_size)
+        self.info = StreamInfo(tuple(frame_size), fps, pixel_format)
+        self.slots = max(1, slots)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._converter = _FrameConverter(pixel_format, text_color)
+        self._ring = None
+
+    def open(self):
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=self.output_path, create=True,
+                                         size=_Ring.size(self.info, self.slots))
+        _created_names.add(self.output_path)
+        shm.buf[:STREAM_HEADER.size] = self.info.pack()
+        self._ring = _Ring(shm, self.info, self.slots)
+        self._ring.control[:] = (self.slots, 0, 0, 0)
+        self._converter.prepare(self._ring.frames)
+        return self
+
+    def _wait_for_reader(self, control, target):
+        """等待读序号达到 target；读序号超过 timeout 秒没有变化时抛出 RuntimeError。"""
+        read = int(control[_CTRL_READ])
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while read < target:
+            time.sleep(self.poll_interval)
+            current = int(control[_CTRL_READ])
+            if current != read:
+                read = current
+                if deadline is not None:
+                    deadline = time.monotonic() + self.timeout
+            elif deadline is not None and time.monotonic() >= deadline:
+                raise RuntimeError(f"共享内存 {self.output_path} 的读取端 {self.timeout:g} 秒没有读取新的帧")
+
+    def write(self, frame, repeat=1):
+        control = self._ring.control
+        frames = self._ring.frames
+        for _ in range(repeat):
+            index = int(control[_CTRL_WRITE])
+            if index - int(control[_CTRL_READ]) >= self.slots:
+                self._wait_for_reader(control, index - self.slots + 1)
+            self._converter.convert(frame, frames[index % self.slots])
+            # 帧数据写完后才增加写序号，读取端看到新序号时这一帧一定是完整的
+            control[_CTRL_WRITE] = index + 1
+        self.frames_written += repeat
+
+    def close(self):
+        if self._ring is None:
+            return
+        try:
+            self._ring.control[_CTRL_CLOSED] = SHM_CLOSED
+            self._wait_for_reader(self._ring.control, int(self._ring.control[_CTRL_WRITE]))
+        finally:
+            self._release(SHM_CLOSED)
+
+    def abort(self):
+        self._release(SHM_ABORTED)
+
+    def _release(self, flag):
+        ring, self._ring = self._ring, None
+        if ring is None:
+            return
+        ring.control[_CTRL_CLOSED] = flag
+        shm = ring.shm
+        ring.release()
+        try:
+            shm.unlink()
+        finally:
+            _created_names.discard(self.output_path)
+
+
+class SharedMemoryReader:
+    """读取 SharedMemoryWriter 写入的帧：for frame in reader 依次得到直接指向共享内存的数组（零拷贝）。
+
+    每一帧只在下一次迭代之前有效，需要保留时请自行复制。写入端结束且所有帧都读完后迭代停止；
+    写入端异常中止时抛出 RuntimeError。
+    """
+
+    def __init__(self, name, poll_interval=STREAM_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        shm = _attach_shared_memory(name)
+        self.info = StreamInfo.unpack(shm.buf)
+        slots = int(np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=SHM_CONTROL_OFFSET)[0])
+        self._ring = _Ring(shm, self.info, slots)
+
+    def __iter__(self):
+        control = self._ring.control
+        frames = self._ring.frames
+        slots = len(frames)
+        while True:
+            index = int(control[_CTRL_READ])
+            while index >= int(control[_CTRL_WRITE]):
+                # 先看结束标志再核对写序号，避免漏掉结束前最后写入的帧
+                closed = int(control[_CTRL_CLOSED])
+                if closed == SHM_ABORTED:
+                    raise RuntimeError("共享内存的写入端已中止")
+                if closed and index >= int(control[_CTRL_WRITE]):
+                    return
+                time.sleep(self.poll_interval)
+            yield frames[index % slots]
+            control[_CTRL_READ] = index + 1
+
+    def close(self):
+        if self._ring is not None:
+            self._ring.release()
+            self._ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class RawStreamReader:
+    """读取 RawStreamWriter 写出的原始帧流（文件对象，例如 sys.stdin.buffer 或打开的命名管道）。
+
+    for frame in reader 依次得到同一块缓冲区中的帧，下一次迭代时被覆盖。
+    """
+
+    def __init__(self, f):
+        self._file = f
+        header = self._read_exactly(STREAM_HEADER.size)
+        if header is None:
+            raise EOFError("原始帧流为空")
+        self.info = StreamInfo.unpack(header)
+
+    def _read_exactly(self, size, out=None):
+        buf = memoryview(out).cast('B') if out is not None else memoryview(bytearray(size))
+        view = buf[:size]
+        got = 0
+        while got < size:
+            n = self._file.readinto(view[got:])
+            if not n:
+                if got:
+                    raise EOFError("原始帧流在一帧的中间结束")
+                return None
+            got += n
+        return buf
+
+    def __iter__(self):
+        frame = np.empty(self.info.shape, dtype=np.uint8)
+        while self._read_exactly(self.info.frame_bytes, frame) is not None:
+            yield frame
@@ -0,0 +1,152 @@
+import dataclasses
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from .constants import BG_VIDEO
+
+# 命令行中的输出目标：宽x高[@帧率][:编码器]=路径，例如 1080x1920@30:libx265=竖屏.mp4
+_TARGET_PATTERN = re.compile(r'^(\d+)[xX](\d+)(?:@(\d+))?(?::([\w-]+))?=(.+)$')
+
+
+@dataclass
+class OutputTarget:
+    """同一次渲染的额外输出：未指定的字段沿用主配置。
+
+    text_size 为空时按分辨率等比缩放主配置的文字大小（取宽、高缩放比例中较小的一个），
+    竖屏等不同宽高比的输出中名字也不会超出画面。
+    """
+    output_path: str
+    frame_size: Optional[tuple] = None
+    fps: Optional[int] = None
+    codec: Optional[str] = None
+    text_size: Optional[int] = None
+
+    def apply(self, config):
+        """返回这个输出目标对应的完整 RenderConfig。"""
+        frame_size = tuple(self.frame_size or config.frame_size)
+        text_size = self.text_size
+        if text_size is None:
+            base_width, base_height = config.frame_size
+            scale = min(frame_size[0] / base_width, frame_size[1] / base_height)
+            text_size = max(1, round(config.text_size * scale))
+        return dataclasses.replace(
+            config,
+            output_path=self.output_path,
+            frame_size=frame_size,
+            fps=self.fps or config.fps,
+            codec=self.codec or config.codec,
+            text_size=text_size,
+            targets=(),
+        )
+
+
+def parse_target(spec):
+    """解析命令行的输出目标描述：宽x高[@帧率][:编码器]=路径。"""
+    match = _TARGET_PATTERN.match(spec)
+    if match is None:
+        raise ValueError(f"无法解析输出目标：{spec}（格式为 宽x高[@帧率][:编码器]=路径）")
+    width, height, fps, codec, path = match.groups()
+    return OutputTarget(path, frame_size=(int(width), int(height)),
+                        fps=int(fps) if fps else None, codec=codec)
+
+
+def render_targets(renderer, names, source=None):
+    """一次读取名单，同时输出多个分辨率/帧率/编码器的视频。
+
+    主配置本身是第一个输出，config.targets 中是其余的输出。字体、静态背景和文字排版
+    按目标的几何参数（分辨率、文字大小）各做一次，几何参数相同的输出直接共用渲染好的帧；
+    视频背景按帧率分组，每组只解码一次原始帧，再缩放到各个输出的分辨率。
+    多输出时在当前进程中渲染，不使用 workers。
+    """
+    from .background import fit_frame, resolve_seed
+    from .engine import NameVideoRenderer
+    from .resources import SharedResources
+
+    cfg = renderer.config
+    resources = renderer.resources or SharedResources(cfg.text_cache_bytes)
+    renderer.text_cache = resources.text_cache(cfg.glyph_atlas, cfg.text_cache_bytes)
+    configs = [dataclasses.replace(cfg, targets=())] + [target.apply(cfg) for target in cfg.targets]
+    children = [NameVideoRenderer(c, resources=resources) for c in configs]
+    timer = renderer.timer
+    for child in children:
+        child.timer = timer
+    fonts = [child.load_font() for child in children]
+    # 几何参数相同的输出只渲染一次，owner[i] 为负责渲染第 i 个输出的下标
+    owners = {}
+    owner = [owners.setdefault((c.frame_size, c.text_size), i) for i, c in enumerate(configs)]
+    groups = {}
+    for i, c in enumerate(configs):
+        groups.setdefault(c.frames_per_name, []).append(i)
+
+    progress = renderer.progress
+    frames_per_round = sum(c.frames_per_name for c in configs)
+    progress.start(0 if source is not None else len(names) * frames_per_round)
+
+    writers = []
+    videos = {}
+    try:
+        for child in children:
+            writers.append(child.open_writer())
+        if cfg.bg_type == BG_VIDEO:
+            # 各组必须从同一个随机起点开始播放
+            seed = resolve_seed(cfg.seed, cfg.bg_random_start)
+            for frames_per_name in groups:
+                videos[frames_per_name] = renderer.open_video_background(seed=seed, scale=False)
+
+        for name in timer.iterate(names, 'names'):
+            renderer.update_estimated_total(source, frames_per_round)
+            progress.set_name(name)
+            for frames_per_name, indices in groups.items():
+                video = videos.get(frames_per_name)
+                if video is None:
+                    frames = {}
+                    for i in indices:
+                        if owner[i] not in frames:
+                            frames[owner[i]] = children[owner[i]].render_name(name, fonts[owner[i]])
+                        t0 = timer.start()
+                        writers[i].write(frames[owner[i]], frames_per_name)
+                        timer.stop('encode', t0)
+                    progress.advance(frames_per_name * len(indices))
+                    continue
+                for _ in range(frames_per_name):
+                    t0 = timer.start()
+                    source_frame = video.read()
+                    timer.stop('video_decode', t0)
+                    fitted = {}
+                    frames = {}
+                    for i in indices:
+                        if owner[i] not in frames:
+                            size = configs[i].frame_size
+                            if size not in fitted:
+                                fitted[size] = fit_frame(source_frame, size, cfg.bg_fit)
+                            frames[owner[i]] = children[owner[i]].render_name(name, fonts[owner[i]], fitted[size])
+                        t0 = timer.start()
+                        writers[i].write(frames[owner[i]], 1)
+                        timer.stop('encode', t0)
+                    progress.advance(len(indices))
+    except BaseException:
+        for writer in writers:
+            try:
+                writer.abort()
+            except Exception:
+                pass
+        raise
+    else:
+        # 每个输出单独收尾，某个 ffmpeg 出错也不影响其余输出关闭，最后抛出第一个错误
+        error = None
+        for writer in writers:
+            try:
+                writer.close()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+    finally:
+        for video in videos.values():
+            video.close()
+
+    if source is not None:
+        progress.set_total(progress.current_frame)
+    progress.finish()
+    return progress.current_frame
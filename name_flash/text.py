@@ -0,0 +1,240 @@
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from .constants import DEFAULT_TEXT_CACHE_BYTES  # noqa: F401
+
+# 字距对缓存的条目上限，超过后整体清空
+MAX_KERNING_PAIRS = 1 << 20
+
+
+class TextLayer:
+    """预先渲染好的文字图层：alpha 遮罩 + 颜色，以及相对绘制原点的包围盒。
+
+    blend 所需的中间量（1-alpha、颜色×alpha）在创建时算好，合成时只做一次乘加。
+    """
+
+    def __init__(self, mask, bbox, color_bgr):
+        self.bbox = bbox
+        self.color_bgr = color_bgr
+        alpha = mask.astype(np.uint16)[..., None]
+        self.inv_alpha = 255 - alpha
+        # 与 PIL 的 DIV255 舍入一致：先加 128
+        self.ink = alpha * np.array(color_bgr, dtype=np.uint16) + 128
+
+    @property
+    def width(self):
+        return self.bbox[2] - self.bbox[0]
+
+    @property
+    def height(self):
+        return self.bbox[3] - self.bbox[1]
+
+    @property
+    def nbytes(self):
+        return self.inv_alpha.nbytes + self.ink.nbytes
+
+    def centered_origin(self, frame_size):
+        """与旧版 draw.text 相同的居中位置（绘制原点，不含包围盒偏移）。"""
+        return (frame_size[0] - self.width) // 2, (frame_size[1] - self.height) // 2
+
+
+def render_text_mask(text, font):
+    """用 FreeType 渲染整段文字，返回 (L 模式遮罩数组, 包围盒)。"""
+    bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
+    width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    mask = Image.new('L', (max(width, 0), max(height, 0)), 0)
+    if width > 0 and height > 0:
+        ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, font=font, fill=255)
+    return np.asarray(mask), bbox
+
+
+def _pixel(value):
+    """26.6 定点数四舍五入到整像素，与 FreeType/PIL 的排版取整一致。"""
+    return (value + 32) >> 6
+
+
+class GlyphAtlas:
+    """单个 (字体, 字号) 的字形图集：每个字符只光栅化一次。
+
+    排版时按字体的 advance 和字距（kerning）把缓存的字形位图放到对应位置，
+    用 NumPy 切片合成整段文字的遮罩，结果与 draw.text 逐像素一致。
+    需要复杂排版（组合字符、控制字符、换行、raqm 排版引擎）的文字交给 FreeType 整体渲染。
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self._glyphs = {}
+        self._kerning = {}
+        self.rasterized = 0
+        self.hits = 0
+
+    def supports(self, text):
+        if self.font.layout_engine != ImageFont.Layout.BASIC:
+            return False
+        for ch in text:
+            if ch in '\r\n' or unicodedata.combining(ch) or unicodedata.category(ch) in ('Mn', 'Me', 'Cf'):
+                return False
+        return True
+
+    def glyph(self, ch):
+        """返回 (遮罩, 包围盒, advance)，advance 为 26.6 定点数。"""
+        glyph = self._glyphs.get(ch)
+        if glyph is None:
+            mask, bbox = render_text_mask(ch, self.font)
+            glyph = (mask, bbox, round(self.font.getlength(ch) * 64))
+            self._glyphs[ch] = glyph
+            self.rasterized += 1
+        else:
+            self.hits += 1
+        return glyph
+
+    def kerning(self, left, right):
+        pair = left + right
+        value = self._kerning.get(pair)
+        if value is None:
+            if len(self._kerning) >= MAX_KERNING_PAIRS:
+                self._kerning.clear()
+            length = self.font.getlength
+            value = round((length(pair) - length(left) - length(right)) * 64)
+            self._kerning[pair] = value
+        return value
+
+    def render_mask(self, text):
+        """与 render_text_mask 返回值相同，但只做字形位图的拼接。"""
+        if not text:
+            return render_text_mask(text, self.font)
+        pen = 0
+        prev = None
+        placed = []
+        for ch in text:
+            if prev is not None:
+                pen += self.kerning(prev, ch)
+            mask, bbox, advance = self.glyph(ch)
+            placed.append((_pixel(pen) + bbox[0], bbox[1], mask))
+            pen += advance
+            prev = ch
+
+        left = min(x for x, _, _ in placed)
+        top = min(y for _, y, _ in placed)
+        right = max(max(x + mask.shape[1] for x, _, mask in placed), _pixel(pen))
+        bottom = max(y + mask.shape[0] for _, y, mask in placed)
+        out = np.zeros((bottom - top, right - left), dtype=np.uint16)
+        for x, y, mask in placed:
+            region = out[y - top:y - top + mask.shape[0], x - left:x - left + mask.shape[1]]
+            # 字形重叠处按 a + b - a*b/255 合成（与 FreeType 拼接整段文字时相同）
+            tmp = region * mask + 128
+            region += mask
+            region -= ((tmp >> 8) + tmp) >> 8
+        return out.astype(np.uint8), (left, top, right, bottom)
+
+
+def parse_color_bgr(color):
+    r, g, b = ImageColor.getrgb(color)[:3] if isinstance(color, str) else tuple(color)[:3]
+    return b, g, r
+
+
+def blend_layer(frame, layer, origin, scratch=None):
+    """把文字图层原地混合到 BGR 帧上，origin 为绘制原点（与 draw.text 的坐标相同）。
+
+    scratch 为两块与帧同尺寸的 uint16 临时缓冲区，提供时整个混合过程不再分配内存。
+    """
+    x = origin[0] + layer.bbox[0]
+    y = origin[1] + layer.bbox[1]
+    frame_h, frame_w = frame.shape[:2]
+    # 文字超出画面时只混合可见部分
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + layer.width, frame_w), min(y + layer.height, frame_h)
+    if x0 >= x1 or y0 >= y1:
+        return frame
+    sy, sx = slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)
+    roi = frame[y0:y1, x0:x1]
+    if scratch is None:
+        tmp = roi * layer.inv_alpha[sy, sx] + layer.ink[sy, sx]
+        roi[...] = ((tmp >> 8) + tmp) >> 8
+        return frame
+
+    tmp = scratch[0][:y1 - y0, :x1 - x0]
+    high = scratch[1][:y1 - y0, :x1 - x0]
+    np.multiply(roi, layer.inv_alpha[sy, sx], out=tmp)
+    np.add(tmp, layer.ink[sy, sx], out=tmp)
+    np.right_shift(tmp, 8, out=high)
+    np.add(tmp, high, out=tmp)
+    np.right_shift(tmp, 8, out=tmp)
+    np.copyto(roi, tmp, casting='unsafe')
+    return frame
+
+
+class TextLayerCache:
+    """按 (文字, 字体, 字号, 颜色) 缓存文字图层的 LRU 缓存，总内存不超过 max_bytes。
+
+    use_atlas 为 True 时，未命中的文字通过 GlyphAtlas 拼接字形生成，而不是重新整体光栅化。
+    """
+
+    def __init__(self, max_bytes=DEFAULT_TEXT_CACHE_BYTES, use_atlas=True):
+        self.max_bytes = max_bytes
+        self.use_atlas = use_atlas
+        self._atlases = {}
+        self._layers = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text, font, color):
+        key = (text, getattr(font, 'path', None), getattr(font, 'size', None), color)
+        layer = self._layers.get(key)
+        if layer is not None:
+            self.hits += 1
+            self._layers.move_to_end(key)
+            return layer
+
+        self.misses += 1
+        mask, bbox = self.render_mask(text, font)
+        layer = TextLayer(mask, bbox, parse_color_bgr(color))
+        if layer.nbytes <= self.max_bytes:
+            self._layers[key] = layer
+            self.current_bytes += layer.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._layers.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+        return layer
+
+    def atlas(self, font):
+        key = (getattr(font, 'path', None), getattr(font, 'size', None))
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(font)
+        return atlas
+
+    def render_mask(self, text, font):
+        if self.use_atlas:
+            atlas = self.atlas(font)
+            if atlas.supports(text):
+                return atlas.render_mask(text)
+        return render_text_mask(text, font)
+
+    def clear(self):
+        self._layers.clear()
+        self._atlases.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._layers)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._layers),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'glyphs_rasterized': sum(a.rasterized for a in self._atlases.values()),
+            'glyph_hits': sum(a.hits for a in self._atlases.values()),
+        }
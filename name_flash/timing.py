@@ -0,0 +1,115 @@
+import time
+
+# 直方图按耗时的 2 的幂分桶：第 i 个桶为 [2^i, 2^(i+1)) 微秒，第 0 个桶包含 2 微秒以下
+HISTOGRAM_BUCKETS = 32
+
+
+class StageStats:
+    """单个阶段的计数、总耗时、最大值和对数直方图。"""
+
+    __slots__ = ('count', 'total_ns', 'max_ns', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = min(HISTOGRAM_BUCKETS - 1, max(0, (elapsed_ns // 1000).bit_length() - 1))
+        self.histogram[bucket] += 1
+
+    def percentile_ms(self, fraction):
+        """按直方图估计分位数（取所在桶的上界），单位毫秒。"""
+        if not self.count:
+            return 0.0
+        target = self.count * fraction
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if seen >= target:
+                return min(self.max_ns, (2 << i) * 1000) / 1e6
+        return self.max_ns / 1e6
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_seconds': self.total_ns / 1e9,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.percentile_ms(0.5),
+            'p95_ms': self.percentile_ms(0.95),
+            'p99_ms': self.percentile_ms(0.99),
+            'max_ms': self.max_ns / 1e6,
+        }
+
+
+class StageTimer:
+    """渲染循环中各阶段的计时器。
+
+    用法：t0 = timer.start(); ...; timer.stop('阶段', t0)。同一阶段可以在不同位置累加。
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+
+    def start(self):
+        return time.perf_counter_ns()
+
+    def stop(self, stage, started):
+        elapsed = time.perf_counter_ns() - started
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.add(elapsed)
+
+    def iterate(self, iterable, stage):
+        """逐项产出 iterable 的元素，把每次取下一项所花的时间计入 stage（例如等待子进程的结果）。"""
+        it = iter(iterable)
+        while True:
+            started = time.perf_counter_ns()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.stop(stage, started)
+            yield item
+
+    def summary(self):
+        return {stage: stats.summary() for stage, stats in self.stages.items()}
+
+
+class NullTimer:
+    """关闭计时时使用的空计时器：所有方法都不做任何事，渲染循环几乎没有额外开销。"""
+
+    enabled = False
+    stages = {}
+
+    def start(self):
+        return 0
+
+    def stop(self, stage, started):
+        pass
+
+    def iterate(self, iterable, stage):
+        return iterable
+
+    def summary(self):
+        return {}
+
+
+NULL_TIMER = NullTimer()
+
+
+def format_stages(stages):
+    """把 StageTimer.summary() 的结果排成文本表格，按总耗时从高到低。"""
+    lines = [f"{'阶段':<16}{'次数':>10}{'总耗时(秒)':>12}{'平均(毫秒)':>12}{'P95(毫秒)':>12}{'最大(毫秒)':>12}"]
+    for stage, s in sorted(stages.items(), key=lambda item: -item[1]['total_seconds']):
+        lines.append(f"{stage:<16}{s['count']:>10}{s['total_seconds']:>12.3f}{s['mean_ms']:>12.3f}"
+                     f"{s['p95_ms']:>12.3f}{s['max_ms']:>12.3f}")
+    return '\n'.join(lines)
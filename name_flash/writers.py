@@ -0,0 +1,228 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from fractions import Fraction
+
+# 输出后端
+WRITER_AUTO = 'auto'        # 有 ffmpeg 时使用 ffmpeg，否则退回 OpenCV
+WRITER_OPENCV = 'opencv'
+WRITER_FFMPEG = 'ffmpeg'
+# 不编码，直接输出原始帧：raw 写到标准输出（路径为 '-'）/命名管道/文件，shm 写到共享内存环形缓冲区
+WRITER_RAW = 'raw'
+WRITER_SHM = 'shm'
+WRITERS = (WRITER_AUTO, WRITER_OPENCV, WRITER_FFMPEG, WRITER_RAW, WRITER_SHM)
+STREAM_WRITERS = (WRITER_RAW, WRITER_SHM)
+STREAM_STDOUT = '-'
+# 共享内存环形缓冲区默认的帧槽数
+DEFAULT_STREAM_SLOTS = 8
+
+# 原始帧的像素格式：bgr24 为合成好的画面，rgba 只输出文字（背景透明）
+PIX_BGR24 = 'bgr24'
+PIX_RGBA = 'rgba'
+PIXEL_FORMATS = (PIX_BGR24, PIX_RGBA)
+
+# ffmpeg 编码器
+CODEC_H264 = 'libx264'
+CODEC_H265 = 'libx265'
+CODEC_VP9 = 'libvpx-vp9'
+CODECS = (CODEC_H264, CODEC_H265, CODEC_VP9)
+DEFAULT_CRF = 23
+DEFAULT_PRESET = 'medium'
+
+
+def find_ffmpeg(ffmpeg_path='ffmpeg'):
+    """返回可执行的 ffmpeg 路径，找不到时返回 None。"""
+    if ffmpeg_path and os.path.isfile(ffmpeg_path):
+        return ffmpeg_path
+    return shutil.which(ffmpeg_path or 'ffmpeg')
+
+
+class FrameWriter:
+    """视频输出后端的统一接口。
+
+    write(frame, repeat) 表示同一帧连续出现 repeat 次，后端可以自行决定是真的写 repeat 次，
+    还是只编码一次并延长它的显示时间。frame 为连续的 BGR uint8 数组，调用返回后即可被覆盖。
+    """
+
+    def __init__(self, output_path, fps, frame_size):
+        self.output_path = output_path
+        self.fps = fps
+        self.frame_size = frame_size
+        self.frames_written = 0
+
+    def open(self):
+        return self
+
+    def write(self, frame, repeat=1):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        """渲染因异常或取消中止时代替 close 调用；默认与 close 相同（已写入的部分照常收尾）。"""
+        self.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class OpenCVWriter(FrameWriter):
+    """cv2.VideoWriter 后端（mp4v），不依赖外部程序，作为默认的兜底方案。"""
+
+    def __init__(self, output_path, fps, frame_size, fourcc='mp4v'):
+        super().__init__(output_path, fps, frame_size)
+        self.fourcc = fourcc
+        self._out = None
+
+    def open(self):
+        import cv2
+        self._out = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                    self.fps, self.frame_size)
+        if not self._out.isOpened():
+            raise RuntimeError(f"无法创建输出视频: {self.output_path}")
+        return self
+
+    def write(self, frame, repeat=1):
+        for _ in range(repeat):
+            self._out.write(frame)
+        self.frames_written += repeat
+
+    def close(self):
+        if self._out is not None:
+            self._out.release()
+            self._out = None
+
+
+class FFmpegWriter(FrameWriter):
+    """把原始 BGR 帧通过管道交给本地 ffmpeg 编码。
+
+    hold_frames > 1 时进入“保持帧”模式：输入帧率设为 fps / hold_frames，
+    每个名字只向编码器发送一次，由时间戳让它持续 hold_frames 帧的时长，
+    编码器不再处理重复帧。此模式下 write 的 repeat 必须是 hold_frames 的整数倍。
+    """
+
+    def __init__(self, output_path, fps, frame_size, codec=CODEC_H264, crf=DEFAULT_CRF,
+                 preset=DEFAULT_PRESET, hold_frames=1, ffmpeg_path='ffmpeg'):
+        super().__init__(output_path, fps, frame_size)
+        if codec not in CODECS:
+            raise ValueError(f"不支持的编码器: {codec}")
+        self.codec = codec
+        self.crf = crf
+        self.preset = preset
+        self.hold_frames = max(1, hold_frames)
+        self.ffmpeg_path = ffmpeg_path
+        self._proc = None
+        self._stderr = None
+
+    def build_command(self, ffmpeg):
+        width, height = self.frame_size
+        input_rate = Fraction(self.fps) / self.hold_frames
+        cmd = [
+            ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+            '-framerate', str(input_rate), '-i', '-',
+            '-an', '-c:v', self.codec, '-crf', str(self.crf),
+        ]
+        if self.codec == CODEC_VP9:
+            # VP9 的 CRF 需要配合 -b:v 0 才是恒定质量模式，没有 x264 式的 preset
+            cmd += ['-b:v', '0', '-row-mt', '1']
+        else:
+            cmd += ['-preset', self.preset]
+        if self.codec == CODEC_H265 and self.output_path.lower().endswith(('.mp4', '.mov')):
+            cmd += ['-tag:v', 'hvc1']
+        if width % 2 or height % 2:
+            # yuv420p 要求宽高为偶数，奇数时在右/下补一像素
+            cmd += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+        cmd += ['-pix_fmt', 'yuv420p']
+        if self.output_path.lower().endswith(('.mp4', '.mov')):
+            cmd += ['-movflags', '+faststart']
+        cmd.append(self.output_path)
+        return cmd
+
+    def open(self):
+        ffmpeg = find_ffmpeg(self.ffmpeg_path)
+        if ffmpeg is None:
+            raise RuntimeError("找不到 ffmpeg，请安装 ffmpeg 或改用 OpenCV 输出")
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(self.build_command(ffmpeg), stdin=subprocess.PIPE,
+                                      stdout=subprocess.DEVNULL, stderr=self._stderr)
+        return self
+
+    def write(self, frame, repeat=1):
+        if repeat % self.hold_frames:
+            raise ValueError(f"保持帧模式下每帧的重复次数必须是 {self.hold_frames} 的整数倍")
+        data = memoryview(frame).cast('B')
+        try:
+            for _ in range(repeat // self.hold_frames):
+                self._proc.stdin.write(data)
+        except BrokenPipeError:
+            self._proc.wait()
+            raise RuntimeError(f"ffmpeg 异常退出：{self._read_stderr()}") from None
+        self.frames_written += repeat
+
+    def _read_stderr(self):
+        self._stderr.seek(0)
+        return self._stderr.read().decode('utf-8', 'replace').strip()
+
+    def close(self):
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = proc.wait()
+        message = self._read_stderr()
+        self._stderr.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg 编码失败（退出码 {returncode}）：{message}")
+
+    def abort(self):
+        """结束 ffmpeg 而不收尾，删除没写完的输出文件；不抛出异常。"""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        proc.kill()
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        proc.wait()
+        self._stderr.close()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+
+def create_writer(output_path, fps, frame_size, writer=WRITER_AUTO, codec=CODEC_H264,
+                  crf=DEFAULT_CRF, preset=DEFAULT_PRESET, hold_frames=1, ffmpeg_path='ffmpeg',
+                  pixel_format=PIX_BGR24, text_color='#ffffff', stream_slots=DEFAULT_STREAM_SLOTS):
+    """按名称创建输出后端；auto 在找不到 ffmpeg 时退回 OpenCV。
+
+    pixel_format、text_color 和 stream_slots 只用于原始帧输出（raw/shm）。
+    """
+    if writer not in WRITERS:
+        raise ValueError(f"未知的输出后端: {writer}")
+    if writer in STREAM_WRITERS:
+        # 原始帧输出需要 numpy，只在使用时才导入
+        from .stream import RawStreamWriter, SharedMemoryWriter
+        if writer == WRITER_SHM:
+            return SharedMemoryWriter(output_path, fps, frame_size, pixel_format=pixel_format,
+                                      text_color=text_color, slots=stream_slots)
+        return RawStreamWriter(output_path, fps, frame_size, pixel_format=pixel_format, text_color=text_color)
+    if pixel_format != PIX_BGR24:
+        raise ValueError(f"只有原始帧输出（{'/'.join(STREAM_WRITERS)}）支持 {pixel_format} 像素格式")
+    if writer == WRITER_AUTO:
+        writer = WRITER_FFMPEG if find_ffmpeg(ffmpeg_path) else WRITER_OPENCV
+    if writer == WRITER_FFMPEG:
+        return FFmpegWriter(output_path, fps, frame_size, codec=codec, crf=crf, preset=preset,
+                            hold_frames=hold_frames, ffmpeg_path=ffmpeg_path)
+    return OpenCVWriter(output_path, fps, frame_size)